@@ -1,32 +1,112 @@
 # api/routes.py
-import math
 import random
 import asyncio
 import time
+import yaml
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from core.commands import send_minecraft_command
-from core.state import player_data
-from models import MobRequest, TeleportRequest, ItemRequest, RouletteOption
-from config.const import colors_by_code, articles_by_mob_type, mob_type_name, pacific_mobs, special_mobs, effects, bad_effects
+from core.state import player_data, public_player_state, online_players
+from core.telemetry import telemetry_hub
+from core.spatial import player_index
+from core.positions import ensure_player_position, refresh_player_positions
+from utils.spawn_placement import find_spawn_points
+from utils.teleport_search import RANDOM_TELEPORT_RANGE, find_safe_y, minecraft_blocks, spread_command
+from utils.animation import animation_scheduler, roulette_frames, log_animation_result
+from core.roulettes import roulette_registry, compile_roulette, effect_roulette, draw_effect
+from core.governor import reserve_entities, governor_stats
+from core.tracing import tracer
+from core.subscriptions import subscription_manager
+from core.items import apply_items
+from core.waves import wave_scheduler
+from core.admission import admission_controller, is_degraded
+from models import MobRequest, TeleportRequest, ItemRequest, ItemBatchRequest, RouletteRequest, WaveRequest
+from config.const import transient_mob_types, title_colors, articles_by_mob_type, mob_type_name, pacific_mobs, special_mobs
 
 router = APIRouter()
 
+@router.get("/players")
+async def get_players():
+    return {name: public_player_state(data) for name, data in list(player_data.items())}
+
+@router.get("/players/stream")
+async def stream_players(interval: float = 0.2):
+    """Stream SSE con los cambios de posición de los jugadores, como máximo uno por jugador cada `interval` segundos."""
+    return StreamingResponse(
+        telemetry_hub.stream(max(0.05, interval)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/players/near")
+async def get_players_near(x: float, y: float, z: float, radius: float):
+    return {"players": player_index.within(x, y, z, radius)}
+
+@router.get("/players/nearest")
+async def get_nearest_players(x: float, y: float, z: float, k: int = 1):
+    return {"players": player_index.nearest(x, y, z, k)}
+
 @router.get("/player_data/{player_name}")
 async def get_player_data(player_name: str):
     if player_name in player_data:
-        return player_data[player_name]
+        return public_player_state(player_data[player_name])
     else:
         raise HTTPException(status_code=404, detail=f"No se encontró información para el jugador {player_name}.")
 
-@router.post("/spawn_mob_at_player")
-async def spawn_mob_at_player(request: MobRequest, player_name: str | None = None, username: str | None = None):
-    if not player_data:
+@router.post("/player_data/refresh")
+async def refresh_player_data():
+    updated = await refresh_player_positions()
+    return {"message": f"Posiciones actualizadas para {updated} jugadores.", "updated": updated}
+
+@router.get("/debug/traces")
+async def get_slowest_traces(limit: int = 10, format: str = "json"):
+    """Las trazas más lentas de las últimas redenciones, con todos sus tramos."""
+    if format not in ("json", "otlp"):
+        raise HTTPException(status_code=400, detail="El formato debe ser json u otlp.")
+    traces = tracer.slowest(limit)
+    return {"traces": [trace.to_otlp() if format == "otlp" else trace.to_json() for trace in traces]}
+
+@router.get("/subscriptions")
+async def get_subscriptions():
+    """Eventos suscritos en el cliente de Minecraft y quién los necesita."""
+    return subscription_manager.stats()
+
+@router.get("/governor")
+async def get_governor_stats():
+    """Ritmo actual, fichas y cola de cada clase de comandos, y mobs vivos por jugador."""
+    return await governor_stats()
+
+@router.get("/admission")
+async def get_admission_stats():
+    """Redenciones en curso, comandos pendientes estimados y peticiones rechazadas o degradadas por ruta."""
+    return admission_controller.stats()
+
+async def _require_online_players():
+    """404 si no hay jugadores conectados; antes se consulta al servidor por si estaban ya en el mundo sin ningún evento."""
+    if not online_players():
+        await refresh_player_positions()
+    if not online_players():
         raise HTTPException(status_code=404, detail="No hay jugadores conectados.")
 
+def _area_selector(position: dict, radius: float) -> str:
+    """Selector de Bedrock para todos los jugadores dentro del radio."""
+    return f"@a[x={position['x']:.1f},y={position['y']:.1f},z={position['z']:.1f},r={radius}]"
+
+def _players_in_area(center_player: str, position: dict, radius: float | None) -> list[str]:
+    """Jugadores afectados: solo el centro, o todos los que el índice espacial encuentra en el radio."""
+    if radius is None:
+        return [center_player]
+    player_index.update(center_player, position)
+    return [name for name in player_index.within(position['x'], position['y'], position['z'], radius) if player_data.get(name, {}).get("position")]
+
+@router.post("/spawn_mob_at_player")
+async def spawn_mob_at_player(request: MobRequest, player_name: str | None = None, username: str | None = None, radius: float | None = None):
+    await _require_online_players()
+
     selected_player_name = None
     
     if player_name == "random" or player_name is None:
-        selected_player_name = random.choice(list(player_data.keys()))
+        selected_player_name = random.choice(online_players())
         print(f"Spawning mob at random player: {selected_player_name}")
     elif player_name in player_data:
         selected_player_name = player_name
@@ -34,52 +114,60 @@ async def spawn_mob_at_player(request: MobRequest, player_name: str | None = Non
     else:
         raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {player_name}.")
 
-    player_pos_data = player_data[selected_player_name]["position"]
+    player_pos_data = await ensure_player_position(selected_player_name)
     
     if not player_pos_data:
         raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {selected_player_name}.")
+
+    # Con `radius` el efecto alcanza a todos los jugadores cercanos al seleccionado
+    target_players = _players_in_area(selected_player_name, player_pos_data, radius)
+    title_target = _area_selector(player_pos_data, radius) if radius is not None else selected_player_name
     
     mob_name = ' '
-    title_command = f"title {selected_player_name} actionbar \"§aHas spawneado {articles_by_mob_type[request.mob_type]} {mob_type_name[request.mob_type]}!\""
+    title_command = f"title {title_target} actionbar \"§aHas spawneado {articles_by_mob_type[request.mob_type]} {mob_type_name[request.mob_type]}!\""
     if username is not None:
-        color = random.choice(list(colors_by_code.keys()))
-        while color in ['§0', '§a']:
-            color = random.choice(list(colors_by_code.keys()))
+        color = random.choice(title_colors)
         mob_name = f' "{color}{username}" '
         
         if request.mob_type in pacific_mobs.keys():
-            title_command = f"title {selected_player_name} actionbar \"{color}{username} §aha spawneado una nueva mascota ({color}{mob_type_name[request.mob_type]}§a)!\""
+            title_command = f"title {title_target} actionbar \"{color}{username} §aha spawneado una nueva mascota ({color}{mob_type_name[request.mob_type]}§a)!\""
         elif request.mob_type == 'lightning_bolt':
-            title_command = f"title {selected_player_name} actionbar \"§aEl Dios {color}{username} §ate ha castigado!\""
+            title_command = f"title {title_target} actionbar \"§aEl Dios {color}{username} §ate ha castigado!\""
         elif request.mob_type == 'wind_charge_projectile':
-            title_command = f"title {selected_player_name} actionbar \"{color}{username} §ate ha empujado!\""
+            title_command = f"title {title_target} actionbar \"{color}{username} §ate ha empujado!\""
         elif request.mob_type in special_mobs.keys():
-            title_command = f"title {selected_player_name} actionbar \"{color}{username} §aha spawneado {articles_by_mob_type[request.mob_type]} {color}{mob_type_name[request.mob_type]}§a!\""
+            title_command = f"title {title_target} actionbar \"{color}{username} §aha spawneado {articles_by_mob_type[request.mob_type]} {color}{mob_type_name[request.mob_type]}§a!\""
         else:
-            title_command = f"title {selected_player_name} actionbar \"§aHa spawneado {color}{username} §a({mob_type_name[request.mob_type]})!\""
+            title_command = f"title {title_target} actionbar \"§aHa spawneado {color}{username} §a({mob_type_name[request.mob_type]})!\""
     
-    player_rotation = player_data[selected_player_name]['rotation']
-    distance = 3
-
-    yaw_in_radians = player_rotation * (math.pi / 180)
-    delta_x = -math.sin(yaw_in_radians) * distance
-    delta_z = math.cos(yaw_in_radians) * distance
-
-    summon_x = player_pos_data['x'] + delta_x
-    summon_z = player_pos_data['z'] + delta_z
+    # Todos los puntos se calculan de una vez, cada mob en un bloque distinto delante de cada jugador
+    points_per_player = await asyncio.gather(*(
+        find_spawn_points(
+            player_data[target]["position"] if target != selected_player_name else player_pos_data,
+            player_data[target].get('rotation', 0),
+            request.quantity,
+            spacing=request.r,
+            # En modo degradado no se comprueba el terreno para ahorrar los `testforblock`
+            check_terrain=request.check_terrain and not is_degraded(),
+        )
+        for target in target_players
+    ))
+    if not any(points_per_player):
+        raise HTTPException(status_code=400, detail=f"No hay espacio libre para spawnear mobs cerca del jugador {selected_player_name}.")
+
+    # Se respeta el límite de mobs vivos por jugador y en total, recortando los que no quepan
+    if request.mob_type not in transient_mob_types:
+        allowed = await reserve_entities({target: len(points) for target, points in zip(target_players, points_per_player)})
+        points_per_player = [points[:allowed[target]] for target, points in zip(target_players, points_per_player)]
+    spawn_points = [point for points in points_per_player for point in points]
+
+    if not spawn_points:
+        raise HTTPException(status_code=429, detail="Hay demasiados mobs vivos. Inténtalo más tarde.", headers={"Retry-After": "30"})
 
     spawn_tasks = []
     
-    for _ in range(request.quantity):
-        # Añade una pequeña variación a las coordenadas para que no se superpongan
-        if request.quantity > 1:
-            random_offset_x = random.randint(-request.r, request.r)
-            random_offset_z = random.randint(-request.r, request.r)
-        else:
-            random_offset_x = 0
-            random_offset_z = 0
-
-        command = f"summon {request.mob_type}{mob_name} {summon_x + random_offset_x} {player_pos_data['y']} {summon_z + random_offset_z}"
+    for summon_x, summon_y, summon_z in spawn_points:
+        command = f"summon {request.mob_type}{mob_name} {summon_x} {summon_y} {summon_z}"
 
         task = send_minecraft_command(command, wait=False)
         spawn_tasks.append(task)
@@ -90,47 +178,21 @@ async def spawn_mob_at_player(request: MobRequest, player_name: str | None = Non
     return {
         "message": f"Mob {request.mob_type} spawnado en {selected_player_name}.", 
         "mob_type": request.mob_type, "player": selected_player_name,
+        "players": target_players,
         "article": articles_by_mob_type[request.mob_type],
         "mob_name": mob_type_name[request.mob_type],
+        "spawned": len(spawn_points),
         "username": username if username else "N/A"
     }
 
-DANGEROUS_BLOCKS = ["lava", "flowing_lava", "fire", "air"]
-GRAVITY_BLOCKS = ["sand", "gravel"]
-
-# Función para verificar si una ubicación es segura
-async def is_safe_location(x: int, y: int, z: int) -> tuple[bool, str]:
-    # 1. Comprueba si los bloques de los pies y la cabeza están libres
-    feet_air_response = await send_minecraft_command(f"testforblock {x} {y} {z} air")
-    head_air_response = await send_minecraft_command(f"testforblock {x} {y + 1} {z} air")
-    
-    if feet_air_response.status != 0 or head_air_response.status != 0:
-        print(f"{feet_air_response}\n{head_air_response}")
-        return False, "no_space"
-
-    # 2. Comprueba si el bloque de abajo es sólido y no peligroso
-    block_below_is_air_response = await send_minecraft_command(f"testforblock {x} {y - 1} {z} air")
-    if block_below_is_air_response.status == 0:
-        return False, "no_floor"
-    
-    for block in DANGEROUS_BLOCKS:
-        dangerous_block_response = await send_minecraft_command(f"testforblock {x} {y - 1} {z} {block}")
-        if dangerous_block_response.status == 0:
-            return False, "dangerous_block"
-        else:
-            print(f"{dangerous_block_response}")
-
-    return True, "safe"
-
 @router.post("/teleport_player")
 async def teleport_player(request: TeleportRequest, player_name: str | None = None, username: str | None = None):
-    if not player_data:
-        raise HTTPException(status_code=404, detail="No hay jugadores conectados.")
+    await _require_online_players()
 
     selected_player_name = None
     
     if player_name == "random" or player_name is None:
-        selected_player_name = random.choice(list(player_data.keys()))
+        selected_player_name = random.choice(online_players())
         print(f"Teleporting at random player: {selected_player_name}")
     elif player_name in player_data:
         selected_player_name = player_name
@@ -138,75 +200,61 @@ async def teleport_player(request: TeleportRequest, player_name: str | None = No
     else:
         raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {player_name}.")
 
-    player_pos_data: dict | None = player_data[selected_player_name]["position"]
+    player_pos_data: dict | None = await ensure_player_position(selected_player_name)
     
     if not player_pos_data:
         raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {selected_player_name}.")
     
-    random_x = random.randint(-3000, 3000)
-    random_z = random.randint(-3000, 3000)
+    random_x = random.randint(-RANDOM_TELEPORT_RANGE, RANDOM_TELEPORT_RANGE)
+    random_z = random.randint(-RANDOM_TELEPORT_RANGE, RANDOM_TELEPORT_RANGE)
     
     destination_x = request.x if request.x is not None else player_pos_data['x'] + random_x
     destination_y = request.y if request.y is not None else player_pos_data['y']
     destination_z = request.z if request.z is not None else player_pos_data['z'] + random_z
+
+    if is_degraded():
+        # Sin la espera de carga ni la búsqueda: el servidor elige el bloque seguro en un solo comando
+        return await spread_to(selected_player_name, destination_x, destination_z, username)
     
     await send_minecraft_command(f"tp {selected_player_name} {int(destination_x)} 320 {int(destination_z)}")
     await send_minecraft_command(f"effect {selected_player_name} slow_falling 43 3 true")
-    await asyncio.sleep(3)
+    with tracer.span("teleport.chunk_load_wait"):
+        await asyncio.sleep(3)
     # Aseguramos que la coordenada Y sea segura (no dentro de un bloque sólido)
     start_time = time.time()
-    
-    safe_destination_y = None
-    low = -59
-    level_above_sea = 64
-    high = 320 # Rango de altura en Minecraft Bedrock
-    last_high = 320
-    i = 1
     print(f"{int(destination_x)}, {int(destination_y)}, {int(destination_z)}")
-    while low <= high:
-        mid = (low + high) // 2
-        is_safe, reason = await is_safe_location(int(destination_x), mid, int(destination_z))
+
+    def log_probe(i: int, mid: int, low: int, high: int, reason: str):
         print(f"Test: {i} - Buscando en Y={mid}, rango: {low} a {high} - {reason}")
-        i = i + 1
-        if is_safe:
-            # Si es seguro, guarda esta posición y busca una más alta
-            safe_destination_y = mid
-            low = mid + 1
-        elif low == high or i > 100: # Si no se encuentra una posición segura en 100 intentos, se detiene la búsqueda
-            break
-        elif reason == "no_floor":
-            # Si no hay piso (es aire), busca más abajo y guarda la última altura alta conocida (ya que desde el punto más alto original hasta esta, sabemos que es aire)
-            last_high = high
-            high = (mid + high) // 2
-        elif reason == "no_space":
-            # Si no hay espacio (bloque sólido en los pies o cabeza), busca más arriba solo si el promedio esta sobre el nivel del mar
-            if mid < level_above_sea:
-                low = mid + 1
-            else:
-                high = last_high
-        else: # "no_space", "dangerous_block", "gravity_block"
-            # Si está bloqueado o es peligroso, repite la validacion en la misma altura pero cambiando X y Z ligeramente
-            destination_x = int(destination_x) + random.randint(-5, 5)
-            destination_z = int(destination_z) + random.randint(-5, 5)
-
-    if safe_destination_y is None:
+
+    with tracer.span("teleport.search") as span:
+        search = await find_safe_y(minecraft_blocks, destination_x, destination_z, on_probe=log_probe)
+        span.set("teleport.probes", search.probes)
+        span.set("teleport.iterations", search.iterations)
+        span.set("teleport.found", search.y is not None)
+    destination_x, destination_z = search.x, search.z
+
+    if search.y is None:
         raise HTTPException(status_code=400, detail="No se pudo encontrar una ubicación segura para teletransportar al jugador.")
     else:
         await send_minecraft_command(f"effect {selected_player_name} clear slow_falling")
-        print(f"Ubicación segura encontrada en Y={safe_destination_y}")
-        destination_y = safe_destination_y
+        print(f"Ubicación segura encontrada en Y={search.y} ({search.probes} consultas)")
+        destination_y = search.y
         
     end_time = time.time()
     execution_time = end_time - start_time
 
     print(f"El código tardó {execution_time} segundos en ejecutarse.")
-            
+
+    return await teleport_to(selected_player_name, player_pos_data, destination_x, destination_y, destination_z, username)
+
+async def teleport_to(selected_player_name: str, player_pos_data: dict, destination_x: float, destination_y: float, destination_z: float, username: str | None = None) -> dict:
+    """Teletransporta al jugador a un destino ya validado y le avisa de la distancia recorrida."""
     command = f"tp {selected_player_name} {int(destination_x)} {int(destination_y)} {int(destination_z)}"
     
     twitch_username = ''
-    valid_colors = [code for code in colors_by_code.keys() if code not in ['§0', '§a']]
     if username is not None:
-        color = random.choice(valid_colors)
+        color = random.choice(title_colors)
         twitch_username += f' por {color}{username} §a'
 
     distance_in_meters = ((int(destination_x) - int(player_pos_data['x'])) ** 2 +
@@ -232,56 +280,54 @@ async def teleport_player(request: TeleportRequest, player_name: str | None = No
         }
     } 
 
+async def spread_to(selected_player_name: str, destination_x: float, destination_z: float, username: str | None = None) -> dict:
+    """Teletransporte degradado con `spreadplayers`: un solo comando, la altura la decide el servidor."""
+    twitch_username = ''
+    if username is not None:
+        color = random.choice(title_colors)
+        twitch_username += f' por {color}{username} §a'
+
+    response = await send_minecraft_command(spread_command(selected_player_name, destination_x, destination_z))
+    if response is None or response.status != 0:
+        raise HTTPException(status_code=400, detail="No se pudo encontrar una ubicación segura para teletransportar al jugador.")
+    await send_minecraft_command(f"title {selected_player_name} actionbar \"§aHas sido teletransportado{twitch_username}a {int(destination_x)}, {int(destination_z)}\"", wait=False)
+
+    return {
+        "message": f"Jugador {selected_player_name} teletransportado cerca de {int(destination_x)}, {int(destination_z)}.",
+        "player": selected_player_name,
+        "coordinates": {"x": int(destination_x), "z": int(destination_z)},
+        "degraded": True,
+    }
+
 @router.post("/roulette_effect")
-async def roulette_effect(player_name: str | None = None, username: str | None = None):
-    await asyncio.sleep(3)
-    if not player_data:
-        raise HTTPException(status_code=404, detail="No hay jugadores conectados.")
+async def roulette_effect(player_name: str | None = None, username: str | None = None, radius: float | None = None):
+    await _require_online_players()
 
     selected_player_name = None
     
     if player_name == "random" or player_name is None:
-        selected_player_name = random.choice(list(player_data.keys()))
+        selected_player_name = random.choice(online_players())
         print(f"Applying effect at random player: {selected_player_name}")
     elif player_name in player_data:
         selected_player_name = player_name
         print(f"Applying effect at specified player: {selected_player_name}")
     else:
         raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {player_name}.")
+
+    # Con `radius` el efecto se aplica con un solo selector a todos los jugadores cercanos
+    effect_target = selected_player_name
+    target_players = [selected_player_name]
+    if radius is not None:
+        player_pos_data = await ensure_player_position(selected_player_name)
+        if not player_pos_data:
+            raise HTTPException(status_code=404, detail=f"No se encontró información de ubicación para el jugador {selected_player_name}.")
+        target_players = _players_in_area(selected_player_name, player_pos_data, radius)
+        effect_target = _area_selector(player_pos_data, radius)
     
-    options = []
-    valid_colors = [code for code in colors_by_code.keys() if code not in ['§0', '§a']]
-    # Build options
-    for effect, name in effects.items():
-        times = random.randint(30, 90)
-        amplifier = random.randint(1, 5)
-        color = random.choice(valid_colors)
-        is_bad = effect in bad_effects.keys()
-        options.append(RouletteOption(name=name, command=f"effect {selected_player_name} {effect} {times} {amplifier}", color=color, is_bad=is_bad, duration=times))
-
-    # Fase 1: Giro rápido (30 iteraciones)
-    winner = None
-    for _ in range(30):
-        winner = random.choice(options)
-        await send_minecraft_command(f'title @a title {color}{winner.name}', wait=False)
-        await send_minecraft_command(f'playsound random.click @a ~ ~ ~ 1 1', wait=False)
-        await asyncio.sleep(0.1) # Pausa corta
-
-    # Fase 2: Ralentización (5 iteraciones con pausas crecientes)
-    slowdown_delays = [0.2, 0.4, 0.6, 0.8, 1.0]
-    for delay in slowdown_delays:
-        winner = random.choice(options)
-        await send_minecraft_command(f'title @a title {winner.color}{winner.name}', wait=False)
-        await send_minecraft_command(f'playsound random.bowhit @a ~ ~ ~ 1 1', wait=False)
-        await asyncio.sleep(delay)
-    
-    # Muestra el título final y un subtítulo
-    await send_minecraft_command(f'title @a title ¡Ha salido!', wait=False)
-    await asyncio.sleep(1)
-    await send_minecraft_command(f'title @a title {winner.color}{winner.name}', wait=False)
-    await send_minecraft_command(f'title @a subtitle ¡Buena suerte!', wait=False)
+    # El ganador se decide antes de animar, la animación solo lo revela
+    winner = draw_effect(effect_target)
 
-    random_color = random.choice(valid_colors)
+    random_color = random.choice(title_colors)
     winner_details = {
         'winner_name': winner.name,
         'winner_duration': winner.duration,
@@ -299,8 +345,7 @@ async def roulette_effect(player_name: str | None = None, username: str | None =
             "¡Aviso de plaga! Has sido infectado con {winner_name} por {random_color}{username}{default_color}."
         ]
         msg = f"\"§c{random.choice(bad_phrases).format(username=username, **winner_details)}\""
-        alert_command = f"title {selected_player_name} actionbar {msg}"
-        await send_minecraft_command(f'playsound mob.enderdragon.death @a ~ ~ ~ 1 1', wait=False)
+        reveal_sound = f'playsound mob.enderdragon.death {effect_target}'
     else:
         default_color = '§a'
         winner_details['default_color'] = default_color
@@ -311,68 +356,112 @@ async def roulette_effect(player_name: str | None = None, username: str | None =
             "Un regalo del cielo ha caído sobre ti. ¡Disfruta de {winner_name}!"
         ]
         msg = f"\"{default_color}{random.choice(good_phrases).format(username=username, **winner_details)}\""
-        alert_command = f"title {selected_player_name} actionbar {msg}"
-        await send_minecraft_command(f'playsound random.levelup @a ~ ~ ~ 1 1', wait=False)
+        reveal_sound = f'playsound random.levelup {effect_target}'
 
-    # Pausa para que el jugador pueda ver el resultado
-    await asyncio.sleep(2)
-    
-    # Ejecuta el comando ganador
-    await send_minecraft_command(winner.command)
-    await send_minecraft_command(alert_command)
-    await send_minecraft_command(f'msg @s {msg}')
+    alert_command = f"title {effect_target} actionbar {msg}"
 
-    return {"message": "Efecto de ruleta aplicado.", "winner": winner.model_dump()}
+    if is_degraded():
+        # Sin animación: se aplica el efecto y se avisa directamente
+        for command in (winner.command, alert_command, f'msg @s {msg}'):
+            await send_minecraft_command(command, wait=False)
+        return {"message": "Efecto aplicado sin animación.", "winner": winner.model_dump(), "players": target_players, "degraded": True}
+
+    frames = roulette_frames(
+        effect_target,
+        spin_titles=effect_roulette.spin_titles,
+        winner_title=f"{winner.color}{winner.name}",
+        final_commands=[winner.command, alert_command, f'msg @s {msg}'],
+        reveal_commands=[reveal_sound],
+    )
+    # La animación corre en el planificador compartido, la petición no espera a que termine
+    animation_scheduler.play(effect_target, frames, start_delay=3).add_done_callback(log_animation_result)
+
+    return {"message": "Ruleta de efectos iniciada.", "winner": winner.model_dump(), "players": target_players}
 
 @router.post("/roulette")
-async def start_roulette():
-    options = [
-        {"name": "Veneno", "command": "effect @p poison 30 1", "color": "§2"},
-        {"name": "Velocidad", "command": "effect @p speed 30 2", "color": ""},
-        {"name": "TNT", "command": "summon tnt ~ ~5 ~", "color": "§4"},
-        {"name": "Armadura de cuero", "command": "replaceitem entity @p slot.armor.head 1 leather_helmet", "color": "§7"},
-        {"name": "Regalo de Diamantes", "command": "give @p diamond 5", "color": "§b"},
-    ]
-
-    # Fase 1: Giro rápido (30 iteraciones)
-    winner = {}
-    for _ in range(30):
-        color = random.choice(list(colors_by_code.keys()))
-        winner = random.choice(options)
-        await send_minecraft_command(f'title @a title {color}{winner["name"]}', wait=False)
-        await send_minecraft_command(f'playsound random.click @a ~ ~ ~ 1 1', wait=False)
-        await asyncio.sleep(0.1) # Pausa corta
-
-    # Fase 2: Ralentización (5 iteraciones con pausas crecientes)
-    slowdown_delays = [0.2, 0.4, 0.6, 0.8, 1.0]
-    for delay in slowdown_delays:
-        color = random.choice(list(colors_by_code.keys()))
-        winner = random.choice(options)
-        await send_minecraft_command(f'title @a title {color}{winner["name"]}', wait=False)
-        await send_minecraft_command(f'playsound random.bowhit @a ~ ~ ~ 1 1', wait=False)
-        await asyncio.sleep(delay)
-    
-    # Muestra el título final y un subtítulo
-    await send_minecraft_command(f'title @a title ¡Ha salido!', wait=False)
-    await asyncio.sleep(1)
-    await send_minecraft_command(f'title @a title {winner["color"]}{winner["name"]}', wait=False)
-    await send_minecraft_command(f'title @a subtitle ¡Buena suerte!', wait=False)
-    await send_minecraft_command(f'playsound random.levelup @a ~ ~ ~ 1 1', wait=False)
-
-    # Pausa para que el jugador pueda ver el resultado
-    await asyncio.sleep(2)
-    
-    # Ejecuta el comando ganador
-    await send_minecraft_command(winner["command"])
+async def start_roulette(request: RouletteRequest | None = None, name: str = "default", player_name: str | None = None):
+    if request is not None:
+        try:
+            roulette = compile_roulette(request)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        roulette = roulette_registry.get(name)
+        if roulette is None:
+            raise HTTPException(status_code=404, detail=f"No existe la ruleta {name}.")
+
+    target = player_name if player_name else "@p"
+    winner = roulette.draw()
+
+    if is_degraded():
+        await send_minecraft_command(winner.command.replace("{player}", target))
+        return {"message": "Ruleta resuelta sin animación y comando ejecutado.", "winner": winner.model_dump(), "degraded": True}
+
+    frames = roulette_frames(
+        "@a",
+        spin_titles=roulette.spin_titles,
+        winner_title=f"{winner.color}{winner.name}",
+        final_commands=[winner.command.replace("{player}", target)],
+        reveal_commands=['playsound random.levelup @a'],
+    )
+    await animation_scheduler.play("@a", frames)
     
-    return {"message": "La ruleta ha terminado y el comando ha sido ejecutado."}
+    return {"message": "La ruleta ha terminado y el comando ha sido ejecutado.", "winner": winner.model_dump()}
+
+@router.post("/roulettes/reload")
+async def reload_roulettes():
+    try:
+        roulette_registry.load()
+    except (OSError, yaml.YAMLError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"No se pudieron recargar las ruletas: {e}")
+    return {"message": "Ruletas recargadas.", "roulettes": roulette_registry.names()}
 
 @router.post("/give_item")
 async def give_item(request: ItemRequest):
-    command = f"give {request.player_name} {request.item_id} {request.amount}"
-    return await send_minecraft_command(command)
+    return await _single_item("give", request)
 
 @router.post("/take_item")
 async def take_item(request: ItemRequest):
-    command = f"clear {request.player_name} {request.item_id} {request.amount}"
-    return await send_minecraft_command(command)
\ No newline at end of file
+    return await _single_item("take", request)
+
+async def _single_item(action: str, request: ItemRequest) -> dict:
+    # Las rutas de un solo ítem no se limitan a `config/items.txt`: aceptan cualquier ítem, como siempre
+    summary = await apply_items(action, [request], validate=False)
+    result = summary["results"][0]
+    if result["status"] == "error":
+        raise HTTPException(status_code=result["status_code"], detail=result["message"])
+    return result
+
+@router.post("/items/batch")
+async def items_batch(request: ItemBatchRequest):
+    """Da o quita varios ítems (a uno o varios jugadores) en una sola petición, con el resultado de cada uno."""
+    return await apply_items(request.action, request.items)
+
+@router.post("/waves")
+async def start_wave(request: WaveRequest, wait: bool = False):
+    """
+    Programa una oleada para todos los jugadores (o los de `players`).
+    Con `wait` la respuesta llega al terminar la oleada, con su informe completo.
+    """
+    await _require_online_players()
+    report, task = wave_scheduler.schedule(request)
+    if wait:
+        await asyncio.shield(task)
+    return report.to_dict()
+
+@router.get("/waves")
+async def list_waves():
+    return {"waves": [report.to_dict() for report in wave_scheduler.recent()]}
+
+@router.get("/waves/{wave_id}")
+async def get_wave(wave_id: str):
+    report = wave_scheduler.get(wave_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"No existe la oleada {wave_id}.")
+    return report.to_dict()
+
+@router.delete("/waves/{wave_id}")
+async def cancel_wave(wave_id: str):
+    if not wave_scheduler.cancel(wave_id):
+        raise HTTPException(status_code=404, detail=f"La oleada {wave_id} no existe o ya terminó.")
+    return {"message": f"Oleada {wave_id} cancelada."}
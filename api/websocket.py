@@ -1,76 +1,88 @@
 # api/websocket.py
+import asyncio
 import json
-import uuid
+import re
 from fastapi import WebSocket, WebSocketDisconnect
-from core.state import active_connections, command_requests
-from core.game_events import game_event_handlers
-from bedrock.response import CommandResponse
-from bedrock.context import get_game_context
-import convert_case
-from core.commands import FakeServer
+from core.state import command_requests
+from core.game_events import handlers_by_event
+from core.subscriptions import subscription_manager
+from core.commands import FakeServer, DetailedCommandResponse, connection_attached, connection_lost
+from core.positions import position_refresher, watch_for_unidentified_players
+from core.snapshots import resume_timers
+from config.const import ipc_role
 
 fake_bedrock_server = FakeServer()
 
-# Lógica para registrar eventos
-async def register_event_listeners(websocket: WebSocket):
-    """Registra los eventos en el cliente de Minecraft al conectarse."""
-    for event in game_event_handlers:
-        command_payload = {
-            "header": {
-                "version": 1,
-                "requestId": str(uuid.uuid4()),
-                "messagePurpose": "subscribe",
-                "messageType": "commandRequest"
-            },
-            "body": {
-                "eventName": event.name,
-            },
-        }
-        await websocket.send_text(json.dumps(command_payload))
+_COMMAND_RESPONSE = re.compile(r'"messagePurpose"\s*:\s*"commandResponse"')
+_REQUEST_ID = re.compile(r'"requestId"\s*:\s*"([^"]+)"')
+
+# Clases de contexto ya resueltas; BedrockPy se importa con el primer evento recibido
+_context_classes: dict = {}
+
+def get_context_class(context_name: str):
+    """Devuelve la clase de contexto de BedrockPy para el evento. Lanza KeyError si no existe."""
+    if context_name not in _context_classes:
+        from bedrock.context import get_game_context
+        _context_classes[context_name] = get_game_context(context_name)
+    return _context_classes[context_name]
 
 async def websocket_endpoint(websocket: WebSocket):
+    if ipc_role == "worker":
+        # La conexión de Minecraft debe ir al proceso puente, no a un worker HTTP
+        await websocket.close(code=1013)
+        print("Conexión de Minecraft rechazada: este proceso es un worker HTTP.")
+        return
+
     await websocket.accept()
-    active_connections.append(websocket)
     print(f"Nuevo cliente de Minecraft conectado: {websocket.client}")
 
-    await register_event_listeners(websocket)
+    # Hasta el primer `querytarget` no se sabe quién está conectado, así que se escuchan los movimientos
+    watch_for_unidentified_players()
+    # Primero se restauran las suscripciones y después salen los comandos que esperaban la reconexión
+    await subscription_manager.attach(websocket)
+    connection_attached(websocket)
+    refresher_task = asyncio.create_task(position_refresher())
+    resume_timers()
 
     try:
         while True:
             data = await websocket.receive_text()
+
+            # Las respuestas se atienden sin decodificar el JSON: se localiza la petición por su id
+            # y las que nadie espera (comandos con wait=False) se descartan directamente
+            if _COMMAND_RESPONSE.search(data):
+                match = _REQUEST_ID.search(data)
+                future = command_requests.pop(match.group(1), None) if match else None
+                if future is not None and not future.done():
+                    future.set_result(DetailedCommandResponse.from_raw(data))
+                continue
+
             message = json.loads(data)
             
             header = message.get("header", {})
             message_purpose = header.get("messagePurpose")
             
-            if message_purpose == "commandResponse":
-                request_id = header.get("requestId")
-                if request_id in command_requests:
-                    future = command_requests.pop(request_id)
-                    response_obj = CommandResponse.parse(message)
-                    future.set_result(response_obj)
-            elif message_purpose == "event":
+            if message_purpose == "event":
                 event_name = header.get("eventName")
                 event_body = message.get("body", {})
 
                 if event_name:
                     try:
-                        # Usamos la función de BedrockPy para obtener la clase de contexto correcta
-                        name = convert_case.snake_case(event_name)
-                        ContextClass = get_game_context(name)
-                        ctx = ContextClass(fake_bedrock_server, event_body)
-                        
-                        # Buscamos y disparamos el handler registrado
-                        for event in game_event_handlers:
-                            if event.name == event_name:
-                                await event(ctx)
+                        # Buscamos los handlers registrados y la clase de contexto de BedrockPy correcta
+                        for event in handlers_by_event.get(event_name, []):
+                            ContextClass = get_context_class(event.context_name)
+                            ctx = ContextClass(fake_bedrock_server, event_body)
+                            await event(ctx)
 
                     except KeyError:
                         # Manejo de eventos no registrados
                         print(f"Evento no manejado: {event_name}")
             
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
         print(f"Cliente de Minecraft desconectado.")
     except Exception as e:
-        print(f"Error en la conexión WebSocket: {e}: {str(e)}")
\ No newline at end of file
+        print(f"Error en la conexión WebSocket: {e}: {str(e)}")
+    finally:
+        connection_lost(websocket)
+        subscription_manager.detach(websocket)
+        refresher_task.cancel()
\ No newline at end of file
@@ -1,4 +1,7 @@
 # config/const.py
+import os
+from types import MappingProxyType
+
 mob_type_name = {
     "bogged": "Enfangado",
     "breeze": "Brisa",
@@ -282,20 +285,145 @@ bad_effects = {
     "wither": "Wither"
 }
 
+# Eventos del cronómetro. `weight` es la probabilidad relativa y `target` la estrategia para elegir
+# al jugador afectado: "owner" (el dueño del cronómetro), "random" o "nearest" (el más cercano al dueño).
 random_events = [
     {
         "name": "Spawn de Mob Hostil",
         "command": "spawn_mob_at_player",
-        "args": {"mob_dict": hostile_mobs, "player_name": "random", "username": "Herobrine"}
+        "weight": 1,
+        "target": "random",
+        "username": "Herobrine",
+        "mob_types": list(hostile_mobs),
+        "quantity": [1, 5],
     },
     {
         "name": "Teletransporte aleatorio",
         "command": "teleport_player",
-        "args": {"player_name": "random", "username": "Cronometro"}
+        "weight": 1,
+        "target": "random",
+        "username": "Cronometro",
     },
     {
         "name": "Efecto de poción aleatorio",
         "command": "roulette_effect",
-        "args": {"player_name": "random", "username": "Cronometro"}
-    }
-]
\ No newline at end of file
+        "weight": 1,
+        "target": "random",
+        "username": "Cronometro",
+    },
+]
+
+# Segundos antes de que acabe el cronómetro en los que se prepara el evento (p. ej. buscar el destino del teletransporte)
+random_event_prewarm_seconds = 15
+
+def _freeze(value):
+    """Convierte diccionarios y listas en vistas inmutables para que nadie modifique la configuración compartida."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Tablas precalculadas una vez al arrancar, en lugar de derivarlas en cada petición
+color_codes = tuple(colors_by_code)
+# Colores válidos para títulos (se excluyen el negro y el verde de los mensajes)
+title_colors = tuple(code for code in colors_by_code if code not in ('§0', '§a'))
+
+mob_type_name = _freeze(mob_type_name)
+articles_by_mob_type = _freeze(articles_by_mob_type)
+colors_by_code = _freeze(colors_by_code)
+hostile_mobs = _freeze(hostile_mobs)
+pacific_mobs = _freeze(pacific_mobs)
+special_mobs = _freeze(special_mobs)
+effects = _freeze(effects)
+nice_effects = _freeze(nice_effects)
+bad_effects = _freeze(bad_effects)
+random_events = _freeze(random_events)
+
+# Segundos entre cada consulta `querytarget @a` para refrescar posiciones
+position_refresh_interval = 5
+# Antigüedad máxima (segundos) de la posición guardada de un jugador para usarla en una ruta sin volver a consultarla
+position_max_age = 1.0
+
+# Límite de comandos de chat por jugador: fichas por segundo y ráfaga máxima
+chat_commands_per_second = 0.5
+chat_command_burst = 3
+
+# Instantáneas del estado (jugadores y cronómetros) para recuperarlo tras un reinicio
+snapshot_path = "state.db"
+snapshot_interval = 5
+
+# Despliegue multiproceso: "bridge" es el proceso con el websocket de Minecraft,
+# "worker" son los procesos HTTP que le reenvían comandos. Sin valor, todo corre en un proceso.
+ipc_role = os.environ.get("MC_IPC_ROLE", "")
+ipc_socket_path = os.environ.get("MC_IPC_SOCKET", "/tmp/minecraft_channel_points.sock")
+ipc_state_sync_interval = 0.5
+
+# Archivo NDJSON donde se registran redenciones, comandos y respuestas (vacío = desactivado)
+event_log_path = os.environ.get("MC_EVENT_LOG", "")
+
+# Gobernador de comandos: límite por clase (fichas por segundo y ráfaga) para no saturar el TPS del servidor.
+# Con la política "queue" los comandos esperan su turno hasta `max_queue` en cola; con "reject" se rechazan (429).
+command_classes = {
+    "summon": {"commands": ["summon"], "rate": 20, "burst": 40, "policy": "queue", "max_queue": 200},
+    "effect": {"commands": ["effect"], "rate": 20, "burst": 40, "policy": "queue", "max_queue": 100},
+    "title": {"commands": ["title", "titleraw", "tellraw"], "rate": 40, "burst": 80, "policy": "queue", "max_queue": 300},
+    "tp": {"commands": ["tp", "teleport", "spreadplayers"], "rate": 5, "burst": 10, "policy": "queue", "max_queue": 20},
+}
+
+# Mobs spawneados que se consideran vivos a la vez (en total y por jugador) y cuánto tiempo se cuentan
+max_live_entities = 200
+max_live_entities_per_player = 60
+spawned_entity_ttl = 120
+# Invocaciones que desaparecen al instante y no cuentan como entidades vivas
+transient_mob_types = ("lightning_bolt", "wind_charge_projectile")
+
+# Trazas por redención: archivo donde exportarlas (vacío = solo en memoria), formato ("json" u "otlp")
+# y cuántas trazas recientes se conservan para /debug/traces
+trace_path = os.environ.get("MC_TRACE_FILE", "")
+trace_format = os.environ.get("MC_TRACE_FORMAT", "otlp")
+trace_history = 200
+
+# Eventos a los que se está suscrito siempre; el resto (p. ej. PlayerTransform) solo mientras algo los necesite
+always_subscribed_events = ["PlayerMessage", "PlayerJoin"]
+# Segundos que se agrupan los cambios de consumidores antes de (des)suscribirse
+subscription_sync_delay = 0.2
+
+# Tras perder la conexión con Minecraft, segundos durante los que los comandos esperan a que el cliente
+# se reconecte en lugar de fallar. Solo se reenvían los comandos en vuelo que no modifican el mundo.
+reconnect_grace = 10
+replay_safe_commands = ["testforblock", "testfor", "querytarget", "list", "title", "titleraw"]
+
+# Oleadas para todo el servidor: comandos que salen por tick (50 ms) para repartir la carga,
+# comandos en vuelo como máximo para las clases sin límite del gobernador y oleadas recientes que se conservan
+wave_commands_per_tick = 8
+wave_tick_seconds = 0.05
+wave_max_in_flight = 64
+wave_history = 50
+# Límites de una oleada: acciones por oleada y segundos máximos de espera antes de empezar
+wave_max_actions = 10
+wave_max_delay = 3600
+
+# Control de admisión de las redenciones (peticiones POST). Se rechaza con 429 si hay más de
+# `admission_max_in_flight` peticiones en curso y con 503 si los comandos pendientes estimados superan
+# `admission_max_backlog`; a partir de `admission_degrade_backlog` las rutas caras se sirven en modo degradado.
+# `cost` es la estimación de comandos de Minecraft de cada ruta y `degraded_cost` la de su versión degradada
+# (solo las rutas que la tienen se degradan). El resto de rutas cuenta `admission_default_cost`.
+admission_max_in_flight = 64
+admission_max_backlog = 400
+admission_degrade_backlog = 150
+admission_default_cost = 2
+admission_routes = {
+    "/spawn_mob_at_player": {"cost": 8, "degraded_cost": 6},
+    "/teleport_player": {"cost": 25, "degraded_cost": 3},
+    "/roulette_effect": {"cost": 40, "degraded_cost": 3},
+    "/roulette": {"cost": 40, "degraded_cost": 1},
+    "/items/batch": {"cost": 10},
+    "/waves": {"cost": 100},
+}
+# Rutas que no envían comandos y nunca se rechazan
+admission_exempt_routes = ["/roulettes/reload"]
+# Animaciones (ruletas) que pueden esperar turno en el planificador; a partir de ahí se rechazan con 503
+animation_max_pending = 100
+# Comandos por segundo que se supone que se despachan mientras aún no hay medidas, para calcular Retry-After
+admission_default_drain_rate = 20
@@ -0,0 +1,174 @@
+# core/admission.py
+import contextvars
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Tuple
+
+from starlette.responses import JSONResponse
+from core.state import command_requests
+from core.governor import RATE_WINDOW, command_governor
+from core.tracing import tracer
+from utils.animation import animation_scheduler
+from config.const import (
+    admission_max_in_flight, admission_max_backlog, admission_degrade_backlog,
+    admission_default_cost, admission_routes, admission_exempt_routes, admission_default_drain_rate,
+)
+
+# True mientras se atiende una petición admitida en modo degradado; las rutas caras lo consultan
+degraded_mode: contextvars.ContextVar[bool] = contextvars.ContextVar("degraded_mode", default=False)
+
+def is_degraded() -> bool:
+    return degraded_mode.get()
+
+class AdmissionController:
+    """
+    Decide si una redención entra, entra degradada o se rechaza, según las peticiones en curso
+    y los comandos de Minecraft pendientes estimados. Rechazar al momento es mejor que aceptar
+    cientos de peticiones que acabarán todas en el tiempo límite de 5 s.
+    """
+
+    def __init__(self, max_in_flight: int, max_backlog: int, degrade_backlog: int,
+                 routes: Dict[str, Dict[str, int]], default_cost: int, exempt: Iterable[str]):
+        self.max_in_flight = max_in_flight
+        self.max_backlog = max_backlog
+        self.degrade_backlog = degrade_backlog
+        self.routes = routes
+        self.default_cost = default_cost
+        self.exempt = set(exempt)
+        self.in_flight = 0
+        self.in_flight_cost = 0
+        # Comandos estimados de las peticiones terminadas, para medir a qué ritmo se vacía la cola
+        self._finished: Deque[Tuple[float, int]] = deque()
+        self.admitted: Dict[str, int] = {}
+        self.degraded: Dict[str, int] = {}
+        self.shed: Dict[str, Dict[int, int]] = {}
+
+    def cost(self, path: str, degraded: bool = False) -> int:
+        route = self.routes.get(path, {})
+        if degraded and "degraded_cost" in route:
+            return route["degraded_cost"]
+        return route.get("cost", self.default_cost)
+
+    def backlog(self) -> int:
+        """
+        Comandos pendientes estimados: lo que falta de las peticiones en curso, o lo que hay en las colas
+        del gobernador, esperando respuesta y en las animaciones programadas (incluye cronómetros y oleadas),
+        lo que sea mayor. Las animaciones cuentan aunque su petición ya haya respondido: sus fotogramas
+        se envían sin esperar respuesta y no pasan por las colas.
+        En un worker HTTP las colas están en el puente, así que solo cuentan sus propias peticiones.
+        """
+        queued = (
+            sum(lane.queued for lane in command_governor.lanes.values())
+            + len(command_requests)
+            + animation_scheduler.queued_commands()
+        )
+        return max(self.in_flight_cost, queued)
+
+    def drain_rate(self) -> float:
+        now = time.monotonic()
+        while self._finished and self._finished[0][0] < now - RATE_WINDOW:
+            self._finished.popleft()
+        measured = sum(cost for _, cost in self._finished) / RATE_WINDOW
+        return max(measured, admission_default_drain_rate)
+
+    def retry_after(self, excess: int) -> int:
+        """Segundos hasta que, al ritmo actual, se haya despachado el exceso de comandos."""
+        return min(60, max(1, math.ceil(excess / self.drain_rate())))
+
+    def decide(self, path: str) -> Tuple[int, bool]:
+        """Devuelve (código, degradado): 200 si se admite, 429 o 503 si se rechaza."""
+        if path in self.exempt:
+            return 200, False
+        if self.in_flight >= self.max_in_flight:
+            return 429, False
+        backlog = self.backlog()
+        degradable = "degraded_cost" in self.routes.get(path, {})
+        degraded = degradable and backlog >= self.degrade_backlog
+        if backlog + self.cost(path, degraded) > self.max_backlog:
+            return 503, False
+        return 200, degraded
+
+    def start(self, path: str, degraded: bool) -> int:
+        cost = self.cost(path, degraded)
+        self.in_flight += 1
+        self.in_flight_cost += cost
+        self.admitted[path] = self.admitted.get(path, 0) + 1
+        if degraded:
+            self.degraded[path] = self.degraded.get(path, 0) + 1
+        return cost
+
+    def finish(self, cost: int):
+        self.in_flight -= 1
+        self.in_flight_cost -= cost
+        self._finished.append((time.monotonic(), cost))
+
+    def reject(self, path: str, status_code: int) -> JSONResponse:
+        by_status = self.shed.setdefault(path, {})
+        by_status[status_code] = by_status.get(status_code, 0) + 1
+        if status_code == 429:
+            detail = "Hay demasiadas redenciones en curso. Inténtalo más tarde."
+            retry_after = self.retry_after(self.in_flight_cost // max(1, self.in_flight))
+        else:
+            detail = "El servidor de Minecraft está saturado. Inténtalo más tarde."
+            retry_after = self.retry_after(self.backlog() + self.cost(path) - self.max_backlog)
+        return JSONResponse(status_code=status_code, content={"detail": detail}, headers={"Retry-After": str(retry_after)})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "backlog": self.backlog(),
+            "degrade_backlog": self.degrade_backlog,
+            "max_backlog": self.max_backlog,
+            "drain_rate": round(self.drain_rate(), 2),
+            "admitted": self.admitted,
+            "degraded": self.degraded,
+            "shed": {path: {str(code): count for code, count in by_status.items()} for path, by_status in self.shed.items()},
+            "shed_total": sum(count for by_status in self.shed.values() for count in by_status.values()),
+        }
+
+admission_controller = AdmissionController(
+    admission_max_in_flight, admission_max_backlog, admission_degrade_backlog,
+    admission_routes, admission_default_cost, admission_exempt_routes,
+)
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI de control de admisión para las redenciones (peticiones POST).
+    Las peticiones rechazadas reciben 429/503 con `Retry-After` sin llegar a la ruta;
+    las degradadas llevan la cabecera `X-Degraded`.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        status_code, degraded = self.controller.decide(path)
+        if status_code != 200:
+            tracer.annotate("admission.shed", status_code)
+            response = self.controller.reject(path, status_code)
+            await response(scope, receive, send)
+            return
+
+        if degraded:
+            tracer.annotate("admission.degraded", True)
+
+        async def degraded_send(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-degraded", b"1")]}
+            await send(message)
+
+        cost = self.controller.start(path, degraded)
+        token = degraded_mode.set(degraded)
+        try:
+            await self.app(scope, receive, degraded_send if degraded else send)
+        finally:
+            degraded_mode.reset(token)
+            self.controller.finish(cost)
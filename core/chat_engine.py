@@ -0,0 +1,185 @@
+# core/chat_engine.py
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from fastapi import HTTPException
+from core.commands import send_minecraft_command
+from utils.token_bucket import TokenBucket
+
+# Cada cuántos segundos se olvidan las cubetas llenas y los enfriamientos vencidos
+PRUNE_INTERVAL = 60.0
+
+@dataclass
+class Argument:
+    """Argumento de un comando de chat."""
+    name: str
+    type: Callable[[str], Any] = str
+    choices: List[str] | None = None
+    default: Any = None
+    required: bool = True
+
+    def parse(self, raw: str) -> Any:
+        try:
+            value = self.type(raw)
+        except ValueError:
+            raise ValueError(f"{self.name} no válido")
+        if self.choices is not None:
+            value = str(value).lower()
+            if value not in self.choices:
+                raise ValueError(f"{self.name} debe ser {'|'.join(self.choices)}")
+        return value
+
+    def usage(self) -> str:
+        label = "|".join(self.choices) if self.choices else self.name
+        return f"<{label}>" if self.required else f"[{label}]"
+
+@dataclass
+class ChatCommand:
+    path: Tuple[str, ...]
+    # Devuelve False si rechaza la invocación (no se aplica el enfriamiento)
+    handler: Callable[..., Awaitable[bool | None]]
+    args: List[Argument] = field(default_factory=list)
+    cooldown: float = 0.0
+    description: str = ""
+
+    def usage(self) -> str:
+        return " ".join(list(self.path) + [arg.usage() for arg in self.args])
+
+    def parse_args(self, tokens: List[str]) -> Dict[str, Any]:
+        if len(tokens) > len(self.args):
+            raise ValueError("demasiados argumentos")
+        values: Dict[str, Any] = {}
+        for i, arg in enumerate(self.args):
+            if i < len(tokens):
+                values[arg.name] = arg.parse(tokens[i])
+            elif arg.required:
+                raise ValueError(f"falta {arg.name}")
+            else:
+                values[arg.name] = arg.default
+        return values
+
+class _TrieNode:
+    __slots__ = ("children", "command")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.command: ChatCommand | None = None
+
+async def reply(sender: str, text: str):
+    """Envía un mensaje solo al jugador que escribió el comando."""
+    rawtext = json.dumps({"rawtext": [{"text": text}]}, ensure_ascii=False)
+    await send_minecraft_command(f'tellraw "{sender}" {rawtext}', wait=False)
+
+class ChatCommandEngine:
+    """
+    Motor de comandos de chat.
+    Los comandos se registran con su esquema de argumentos en un árbol de prefijos
+    (`!timer start`, `!timer stop`...), de modo que cada mensaje se resuelve recorriendo sus palabras una vez.
+    Cada jugador tiene una cubeta de fichas y enfriamientos por comando, y las respuestas van solo a él.
+    """
+
+    def __init__(self, rate: float, burst: float, max_concurrent: int = 4):
+        self._root = _TrieNode()
+        self._commands: List[ChatCommand] = []
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._cooldowns: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: Set[asyncio.Task] = set()
+        self.rate = rate
+        self.burst = burst
+        self.dropped = 0
+        self._pruned_at = time.monotonic()
+
+    def command(self, path: str, args: List[Argument] | None = None, cooldown: float = 0.0, description: str = ""):
+        """Decorador para registrar un comando, p. ej. `@engine.command("!timer stop")`."""
+        def decorator(fn: Callable[..., Awaitable[bool | None]]):
+            self.register(ChatCommand(tuple(path.lower().split()), fn, args or [], cooldown, description))
+            return fn
+        return decorator
+
+    def register(self, command: ChatCommand):
+        node = self._root
+        for token in command.path:
+            node = node.children.setdefault(token, _TrieNode())
+        node.command = command
+        self._commands.append(command)
+
+    def commands(self) -> List[ChatCommand]:
+        return list(self._commands)
+
+    def _resolve(self, tokens: List[str]) -> Tuple[ChatCommand | None, List[str], _TrieNode | None]:
+        """Devuelve el comando con el prefijo más largo, los argumentos restantes y el último nodo visitado."""
+        node = self._root
+        found: ChatCommand | None = None
+        consumed = 0
+        for i, token in enumerate(tokens):
+            child = node.children.get(token.lower())
+            if child is None:
+                break
+            node = child
+            if node.command is not None:
+                found, consumed = node.command, i + 1
+        return found, tokens[consumed:], node if node is not self._root else None
+
+    def dispatch(self, message: str, sender: str):
+        """Procesa el mensaje en segundo plano para no bloquear la lectura del websocket."""
+        task = asyncio.create_task(self.handle(message, sender))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _prune(self, now: float):
+        """Descarta el estado que ya no influye: una cubeta llena equivale a una nueva, y un enfriamiento vencido a ninguno."""
+        if now - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        for sender, bucket in list(self._buckets.items()):
+            if bucket.is_full():
+                del self._buckets[sender]
+        for key, ready_at in list(self._cooldowns.items()):
+            if ready_at <= now:
+                del self._cooldowns[key]
+
+    async def handle(self, message: str, sender: str):
+        self._prune(time.monotonic())
+        bucket = self._buckets.get(sender)
+        if bucket is None:
+            bucket = self._buckets[sender] = TokenBucket(self.rate, self.burst)
+        if not bucket.take():
+            # Se descarta sin responder: contestar también consumiría el socket
+            self.dropped += 1
+            return
+
+        tokens = message.strip().split()
+        if not tokens:
+            return
+
+        command, params, node = self._resolve(tokens)
+        async with self._semaphore:
+            try:
+                if command is None:
+                    if node is not None and node.children:
+                        await reply(sender, f"§cUso: {' | '.join(c.usage() for c in self._commands if c.path[0] == tokens[0].lower())}")
+                    else:
+                        await reply(sender, "§cComando desconocido. Usa !help.")
+                    return
+
+                try:
+                    values = command.parse_args(params)
+                except ValueError as e:
+                    await reply(sender, f"§cUso incorrecto ({e}): {command.usage()}")
+                    return
+
+                key = (sender, command.path)
+                now = time.monotonic()
+                ready_at = self._cooldowns.get(key, 0.0)
+                if now < ready_at:
+                    await reply(sender, f"§eEspera {ready_at - now:.0f}s para volver a usar {' '.join(command.path)}.")
+                    return
+                # El enfriamiento solo cuenta si el comando se ejecutó: un manejador que rechaza la invocación devuelve False
+                if await command.handler(sender, **values) is not False and command.cooldown:
+                    self._cooldowns[key] = time.monotonic() + command.cooldown
+            except HTTPException as e:
+                print(f"Error al ejecutar el comando de {sender}: {e.detail}")
@@ -1,52 +1,242 @@
 # core/commands.py
 import asyncio
 import json
+import re
+import time
 import uuid
-from typing import Dict, Any
+from typing import Any, Awaitable, Callable, Dict
 from fastapi import HTTPException
-from bedrock.response import CommandResponse
 from core.state import active_connections, command_requests
+from core.event_log import event_log, current_redemption, current_command_seq, next_command_seq
+from core.governor import command_governor
+from core.tracing import tracer
+from config.const import reconnect_grace, replay_safe_commands
+
+_STATUS_CODE = re.compile(r'"statusCode"\s*:\s*(-?\d+)')
+
+class DetailedCommandResponse:
+    """
+    Respuesta de un comando con la misma interfaz que `bedrock.response.CommandResponse`,
+    pero que además conserva el campo `details` (p. ej. el JSON de `querytarget`).
+    No hereda de BedrockPy para no importar todo el paquete al arrancar.
+
+    Creada con `from_raw`, solo se extrae el código de estado; el resto del mensaje se
+    decodifica la primera vez que se pide (`message`, `details` o `body`).
+    """
+
+    __slots__ = ("_status", "_raw", "_body")
+
+    def __init__(self, message: str | None = None, status: int = 0, details: str | None = None):
+        self._status = status
+        self._raw: str | None = None
+        self._body: Dict[str, Any] | None = {"statusCode": status, "statusMessage": message, "details": details}
+
+    @classmethod
+    def from_raw(cls, raw: str) -> "DetailedCommandResponse":
+        match = _STATUS_CODE.search(raw)
+        if match is None:
+            return cls.parse(json.loads(raw))
+        response = cls.__new__(cls)
+        response._status = int(match.group(1))
+        response._raw = raw
+        response._body = None
+        return response
+
+    @classmethod
+    def parse(cls, data: Dict[str, Any]) -> "DetailedCommandResponse":
+        body = data["body"]
+        response = cls.__new__(cls)
+        response._status = body["statusCode"]
+        response._raw = None
+        response._body = body
+        return response
+
+    @property
+    def body(self) -> Dict[str, Any]:
+        """Cuerpo completo de la respuesta (p. ej. `players` en la de `list`)."""
+        if self._body is None:
+            self._body = json.loads(self._raw)["body"]
+            self._raw = None
+        return self._body
+
+    @property
+    def message(self) -> str:
+        return self.body.get("statusMessage")
+
+    @property
+    def status(self) -> int:
+        return self._status
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 0
+
+    @property
+    def details(self) -> str | None:
+        return self.body.get("details")
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            from bedrock.exceptions import CommandRequestError
+            raise CommandRequestError(self.message, self.status)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DetailedCommandResponse):
+            return NotImplemented
+        return (self.status, self.message, self.details) == (other.status, other.message, other.details)
+
+    def __repr__(self) -> str:
+        # No se decodifica el cuerpo solo para imprimirlo
+        if self._body is None:
+            return f"DetailedCommandResponse(status={self._status})"
+        return f"DetailedCommandResponse(status={self._status}, message={self._body.get('statusMessage')!r})"
 
 # Clase para simular el servidor de BedrockPy
 class FakeServer:
-    async def run(self, command: str, *, wait: bool = True) -> CommandResponse | None:
+    async def run(self, command: str, *, wait: bool = True) -> DetailedCommandResponse | None:
         return await send_minecraft_command(command)
 
-async def send_minecraft_command(command: str, wait: bool = True) -> CommandResponse | None:
+# En modo multiproceso los workers HTTP reenvían los comandos al proceso dueño del websocket
+CommandForwarder = Callable[[str, bool], Awaitable[DetailedCommandResponse | None]]
+command_forwarder: CommandForwarder | None = None
+
+def set_command_forwarder(forwarder: CommandForwarder | None):
+    global command_forwarder
+    command_forwarder = forwarder
+
+async def send_minecraft_command(command: str, wait: bool = True) -> DetailedCommandResponse | None:
+    redemption_id = current_redemption.get()
+    seq = next_command_seq()
+    event_log.record("command", redemption=redemption_id, seq=seq, command=command, wait=wait)
+    start = time.monotonic()
+    seq_token = current_command_seq.set(seq)
+    with tracer.span("minecraft.command", **{"minecraft.command": command, "minecraft.wait": wait}) as span:
+        try:
+            if command_forwarder is not None:
+                result = await command_forwarder(command, wait)
+            else:
+                # Solo el proceso dueño del websocket aplica el límite, así cuenta los comandos de todos los workers
+                await command_governor.acquire(command)
+                span.set("governor.wait_ms", round((time.monotonic() - start) * 1000, 3))
+                result = await _send_to_client(command, wait)
+        except HTTPException as e:
+            event_log.record("response", redemption=redemption_id, seq=seq, command=command, error=e.status_code, latency=time.monotonic() - start)
+            raise
+        finally:
+            current_command_seq.reset(seq_token)
+
+        if result is not None:
+            span.set("minecraft.status", result.status)
+            # El mensaje solo se decodifica si hay registro de eventos
+            if event_log.enabled:
+                event_log.record("response", redemption=redemption_id, seq=seq, command=command, status=result.status, message=result.message, latency=time.monotonic() - start)
+        return result
+
+class ConnectionLost(Exception):
+    """La conexión con Minecraft se cerró antes de recibir la respuesta del comando."""
+
+# Conexión por la que se envió cada comando pendiente de respuesta
+_request_connections: Dict[str, Any] = {}
+_connection_ready = asyncio.Event()
+_disconnected_at: float | None = None
+
+def connection_attached(connection: Any):
+    """Registra un cliente de Minecraft; los comandos que esperaban la reconexión se envían por él."""
+    global _disconnected_at
+    active_connections.append(connection)
+    _disconnected_at = None
+    _connection_ready.set()
+
+def connection_lost(connection: Any):
+    """
+    Da de baja un cliente. Los comandos en vuelo por esa conexión fallan de inmediato en lugar de
+    esperar al tiempo límite; los que son seguros de repetir se reenviarán al reconectarse.
+    """
+    global _disconnected_at
+    if connection in active_connections:
+        active_connections.remove(connection)
     if not active_connections:
-        raise HTTPException(status_code=503, detail="No hay jugadores de Minecraft conectados.")
-
-    command_id = str(uuid.uuid4())
-    command_payload = {
-        "header": {
-            "version": 1,
-            "requestId": command_id,
-            "messagePurpose": "commandRequest",
-            "messageType": "commandRequest"
-        },
-        "body": {
-            "commandLine": command,
-            "version": 1,
-        },
-    }
-    
-    if wait:
-        future = asyncio.get_event_loop().create_future()
-        command_requests[command_id] = future
-    
-    
-    connection = active_connections[0]
-    await connection.send_text(json.dumps(command_payload))
-    
-    if wait:
+        _connection_ready.clear()
+        _disconnected_at = time.monotonic()
+
+    for command_id, owner in list(_request_connections.items()):
+        if owner is not connection:
+            continue
+        del _request_connections[command_id]
+        future = command_requests.pop(command_id, None)
+        if future is not None and not future.done():
+            future.set_exception(ConnectionLost())
+
+def is_replay_safe(command: str) -> bool:
+    """Comandos de solo lectura (o sin efecto en el mundo) que se pueden repetir sin duplicar nada."""
+    return command.lstrip("/").split(" ", 1)[0].lower() in replay_safe_commands
+
+async def _wait_for_connection() -> Any:
+    """
+    Devuelve la conexión activa. Si se acaba de perder, espera a que el cliente vuelva
+    durante `reconnect_grace` segundos; si no hubo conexión reciente, falla al momento.
+    """
+    while not active_connections:
+        if _disconnected_at is None:
+            raise HTTPException(status_code=503, detail="No hay jugadores de Minecraft conectados.")
+        remaining = _disconnected_at + reconnect_grace - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(status_code=503, detail="No hay jugadores de Minecraft conectados.")
+        try:
+            await asyncio.wait_for(_connection_ready.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
+    return active_connections[0]
+
+async def _send_to_client(command: str, wait: bool) -> DetailedCommandResponse | None:
+    while True:
+        connection = await _wait_for_connection()
+
+        command_id = str(uuid.uuid4())
+        tracer.annotate("minecraft.request_id", command_id)
+        command_payload = {
+            "header": {
+                "version": 1,
+                "requestId": command_id,
+                "messagePurpose": "commandRequest",
+                "messageType": "commandRequest"
+            },
+            "body": {
+                "commandLine": command,
+                "version": 1,
+            },
+        }
+
+        if wait:
+            future = asyncio.get_event_loop().create_future()
+            command_requests[command_id] = future
+            _request_connections[command_id] = connection
+
+        try:
+            await connection.send_text(json.dumps(command_payload))
+        except Exception as e:
+            # No llegó a enviarse, así que se puede reintentar con la siguiente conexión
+            print(f"No se pudo enviar el comando, se reintentará al reconectar: {e}")
+            command_requests.pop(command_id, None)
+            _request_connections.pop(command_id, None)
+            connection_lost(connection)
+            continue
+
+        if not wait:
+            return None
+
         try:
             print(f"Comando enviado: {command}")
             result = await asyncio.wait_for(future, timeout=5.0)
             print(f"Resultado: {result}")
             return result
+        except ConnectionLost:
+            if is_replay_safe(command):
+                print(f"Conexión perdida, se reenviará al reconectar: {command}")
+                continue
+            raise HTTPException(status_code=503, detail="Se perdió la conexión con Minecraft antes de confirmar el comando.")
         except asyncio.TimeoutError:
-            if command_id in command_requests:
-                del command_requests[command_id]
             raise HTTPException(status_code=504, detail="El servidor de Minecraft no respondió a tiempo.")
-
-    return None
\ No newline at end of file
+        finally:
+            command_requests.pop(command_id, None)
+            _request_connections.pop(command_id, None)
@@ -0,0 +1,149 @@
+# core/event_log.py
+import asyncio
+import contextvars
+import itertools
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Coroutine, Dict, Iterator, List, Tuple
+from urllib.parse import parse_qsl
+
+from core.state import player_data
+from config.const import event_log_path
+
+# Id de la redención que se está atendiendo, para asociarle los comandos que genera
+current_redemption: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_redemption", default=None)
+# Contador de los comandos de la redención, compartido por las tareas que trabajan para ella;
+# la reproducción asocia cada respuesta registrada a su comando por (redención, orden)
+_command_counter: contextvars.ContextVar[Iterator[int] | None] = contextvars.ContextVar("command_counter", default=None)
+# Orden del comando que se está enviando dentro de su redención
+current_command_seq: contextvars.ContextVar[int | None] = contextvars.ContextVar("current_command_seq", default=None)
+
+RedemptionScope = Tuple[str | None, Iterator[int] | None]
+
+def next_command_seq() -> int | None:
+    counter = _command_counter.get()
+    return next(counter) if counter is not None else None
+
+def capture_redemption() -> RedemptionScope:
+    """La redención en curso, para seguir asociándole comandos desde otra tarea."""
+    return current_redemption.get(), _command_counter.get()
+
+@contextmanager
+def redemption_scope(scope: RedemptionScope):
+    redemption_token = current_redemption.set(scope[0])
+    counter_token = _command_counter.set(scope[1])
+    try:
+        yield
+    finally:
+        _command_counter.reset(counter_token)
+        current_redemption.reset(redemption_token)
+
+def start_redemption(redemption_id: str | None) -> RedemptionScope:
+    """Ámbito de una redención nueva, con su contador de comandos desde cero."""
+    return redemption_id, itertools.count()
+
+def background_task(coro: Coroutine, scope: RedemptionScope = (None, None)) -> asyncio.Task:
+    """
+    Crea una tarea que sobrevive a la petición que la lanza. Empieza con un contexto vacío para no heredar
+    la redención (ni la traza) de esa petición; con `scope` sus comandos se asocian a la redención indicada.
+    """
+    context = contextvars.Context()
+    context.run(current_redemption.set, scope[0])
+    context.run(_command_counter.set, scope[1])
+    return asyncio.create_task(coro, context=context)
+
+class EventLog:
+    """
+    Registro NDJSON, solo de anexado, de redenciones, comandos y respuestas.
+    Las líneas se acumulan en memoria y se escriben en un hilo aparte cada `flush_interval` segundos.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._flush_scheduled = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def record(self, kind: str, **fields: Any):
+        if not self.enabled:
+            return
+        self.append(json.dumps({"t": time.time(), "kind": kind, **fields}, ensure_ascii=False, default=str))
+
+    def append(self, line: str):
+        """Añade una línea ya serializada al búfer."""
+        if not self.enabled:
+            return
+        self._buffer.append(line)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop = asyncio.get_running_loop()
+            loop.call_later(self.flush_interval, lambda: loop.create_task(self.flush()))
+
+    def _write(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self):
+        self._flush_scheduled = False
+        lines, self._buffer = self._buffer, []
+        if lines:
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except OSError as e:
+                print(f"No se pudo escribir el registro de eventos: {e}")
+
+event_log = EventLog(event_log_path)
+
+def _player_positions() -> Dict[str, Dict]:
+    return {name: {"position": data.get("position"), "rotation": data.get("rotation", 0)} for name, data in list(player_data.items())}
+
+class EventLogMiddleware:
+    """Middleware ASGI que registra cada redención (petición POST) con su cuerpo y resultado."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not event_log.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # Se lee el cuerpo completo para registrarlo y después se le entrega igual a la ruta
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        async def replay_receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        redemption_id = uuid.uuid4().hex
+        status_code = 500
+        start = time.monotonic()
+
+        async def logging_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        event_log.record(
+            "redemption",
+            id=redemption_id,
+            path=scope["path"],
+            query=dict(parse_qsl(scope.get("query_string", b"").decode())),
+            body=body.decode("utf-8", errors="replace"),
+            players=_player_positions(),
+        )
+        with redemption_scope(start_redemption(redemption_id)):
+            await self.app(scope, replay_receive, logging_send)
+            event_log.record("redemption_end", id=redemption_id, status_code=status_code, duration=time.monotonic() - start)
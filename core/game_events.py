@@ -1,17 +1,38 @@
 # core/game_events.py
-import convert_case
-from typing import Any, Awaitable, Callable
-from bedrock.context import GameContext, PlayerTransformContext, PlayerMessageContext
-from bedrock.events import GameEvent
+from __future__ import annotations
 
-from core.state import game_event_handlers, player_data
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List
+from attrs import define
+
+from core.state import game_event_handlers, player_data, mark_online
 from core.custom_commands import parse_and_execute_command
+from core.telemetry import telemetry_hub
+from core.spatial import player_index
+from core.positions import mark_position_fresh
+
+if TYPE_CHECKING:
+    # Los contextos de BedrockPy solo se importan al llegar el primer evento (ver api/websocket.py)
+    from bedrock.context import GameContext, PlayerTransformContext, PlayerMessageContext
+
+@define
+class GameEvent:
+    """Equivalente ligero de `bedrock.events.GameEvent`, para no importar BedrockPy al arrancar."""
+    name: str
+    handler: Callable[[GameContext], Awaitable[Any]]
+    # Nombre en snake_case con el que BedrockPy identifica la clase de contexto
+    context_name: str
+
+    async def __call__(self, ctx: GameContext) -> None:
+        return await self.handler(ctx)
+
+# Eventos indexados por su nombre en el protocolo (PascalCase)
+handlers_by_event: Dict[str, List[GameEvent]] = {}
 
 def game_event(fn: Callable[[GameContext], Awaitable[Any]]) -> GameEvent:
-    event_name = fn.__name__.replace('_', ' ')
-    event_name = convert_case.pascal_case(event_name)
-    event = GameEvent(event_name, fn)
+    event_name = "".join(part.capitalize() for part in fn.__name__.split('_'))
+    event = GameEvent(event_name, fn, fn.__name__)
     game_event_handlers.append(event)
+    handlers_by_event.setdefault(event_name, []).append(event)
     return event
 
 @game_event
@@ -31,6 +52,12 @@ async def player_transform(ctx: PlayerTransformContext):
     }
     
     player_data[player_name]["rotation"] = ctx._data.get('player', {}).get("yRot", 0)
+    # Guarda el id de la entidad para asociar los resultados de `querytarget`
+    player_data[player_name]["id"] = ctx._data.get('player', {}).get("id")
+    player_index.update(player_name, player_data[player_name]["position"])
+    mark_position_fresh(player_name)
+    mark_online(player_name)
+    telemetry_hub.publish(player_name)
 
 @game_event
 async def player_join(ctx: GameContext):
@@ -39,7 +66,11 @@ async def player_join(ctx: GameContext):
     # así que usamos la clase base GameContext para acceder a los datos.
     player_name = ctx.data.get("player", {}).get("name")
     if player_name:
-        player_data[player_name] = {"position": None}
+        # Se actualiza la entrada existente: un cronómetro restaurado o reanudado conserva su estado
+        player_data.setdefault(player_name, {})["position"] = None
+        player_index.remove(player_name)
+        mark_online(player_name)
+        telemetry_hub.publish(player_name)
         print(f"El jugador {player_name} se ha unido al mundo.")
 
 @game_event
@@ -0,0 +1,180 @@
+# core/governor.py
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from fastapi import HTTPException
+from utils.token_bucket import TokenBucket
+from config.const import (
+    command_classes, ipc_role,
+    max_live_entities, max_live_entities_per_player, spawned_entity_ttl,
+)
+
+# Ventana en segundos para calcular el ritmo real de envío de cada clase
+RATE_WINDOW = 10.0
+
+class CommandLane:
+    """Una clase de comandos (summon, effect...): su cubeta de fichas, su cola y sus métricas."""
+
+    def __init__(self, name: str, rate: float, burst: float, policy: str = "queue", max_queue: int = 100):
+        if rate <= 0:
+            # Sin ritmo de relleno la cola nunca avanzaría
+            raise ValueError(f"La clase de comandos '{name}' necesita un ritmo (rate) mayor que 0.")
+        self.name = name
+        self.policy = policy
+        self.max_queue = max_queue
+        self.bucket = TokenBucket(rate, burst)
+        # asyncio.Lock atiende a los que esperan en orden de llegada
+        self._lock = asyncio.Lock()
+        self._sent_at: Deque[float] = deque()
+        self.queued = 0
+        self.sent = 0
+        self.rejected = 0
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        retry_after = self.bucket.wait_time() + self.queued / self.bucket.rate if self.bucket.rate > 0 else 60
+        raise HTTPException(
+            status_code=429,
+            detail=f"Demasiados comandos '{self.name}' ({reason}). Inténtalo más tarde.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def _record(self):
+        now = time.monotonic()
+        self.sent += 1
+        self._sent_at.append(now)
+        while self._sent_at and self._sent_at[0] < now - RATE_WINDOW:
+            self._sent_at.popleft()
+
+    async def acquire(self):
+        """Espera una ficha para enviar un comando, o lanza 429 según la política."""
+        # Camino rápido: nadie en cola y hay fichas
+        if self.queued == 0 and self.bucket.take():
+            self._record()
+            return
+        if self.policy == "reject":
+            self._reject("límite por segundo alcanzado")
+        if self.queued >= self.max_queue:
+            self._reject("cola llena")
+
+        self.queued += 1
+        try:
+            async with self._lock:
+                while not self.bucket.take():
+                    await asyncio.sleep(self.bucket.wait_time())
+        finally:
+            self.queued -= 1
+        self._record()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        recent = sum(1 for sent_at in self._sent_at if sent_at >= now - RATE_WINDOW)
+        return {
+            "rate_limit": self.bucket.rate,
+            "burst": self.bucket.capacity,
+            "policy": self.policy,
+            "tokens": round(self.bucket.tokens, 2),
+            "rate": round(recent / RATE_WINDOW, 2),
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "sent": self.sent,
+            "rejected": self.rejected,
+        }
+
+class CommandGovernor:
+    """
+    Limita cuántos comandos por segundo llegan al mundo, por clase de comando,
+    para que una avalancha de redenciones no hunda el TPS del servidor.
+    Los comandos que no pertenecen a ninguna clase pasan sin límite.
+    """
+
+    def __init__(self, classes: Dict[str, Dict[str, Any]]):
+        self.lanes: Dict[str, CommandLane] = {
+            name: CommandLane(name, config["rate"], config["burst"], config.get("policy", "queue"), config.get("max_queue", 100))
+            for name, config in classes.items()
+        }
+        self._lane_by_keyword: Dict[str, CommandLane] = {
+            keyword: self.lanes[name] for name, config in classes.items() for keyword in config["commands"]
+        }
+
+    def classify(self, command: str) -> CommandLane | None:
+        keyword = command.lstrip("/").split(" ", 1)[0].lower()
+        # `execute ... run summon ...` cuenta como el comando que ejecuta
+        if keyword == "execute" and " run " in command:
+            keyword = command.rsplit(" run ", 1)[1].split(" ", 1)[0].lower()
+        return self._lane_by_keyword.get(keyword)
+
+    async def acquire(self, command: str):
+        lane = self.classify(command)
+        if lane is not None:
+            await lane.acquire()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+class EntityTracker:
+    """
+    Cuenta los mobs spawneados que siguen vivos, en total y por jugador.
+    El servidor no avisa cuando mueren, así que cada mob se deja de contar pasados `ttl` segundos.
+    """
+
+    def __init__(self, max_total: int, max_per_player: int, ttl: float):
+        self.max_total = max_total
+        self.max_per_player = max_per_player
+        self.ttl = ttl
+        self._expires: Dict[str, Deque[float]] = {}
+
+    def _expire(self):
+        now = time.monotonic()
+        for player in list(self._expires):
+            expires = self._expires[player]
+            while expires and expires[0] <= now:
+                expires.popleft()
+            if not expires:
+                del self._expires[player]
+
+    def live(self) -> Dict[str, int]:
+        self._expire()
+        return {player: len(expires) for player, expires in self._expires.items()}
+
+    def reserve(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """Reserva hueco para los mobs pedidos por jugador y devuelve cuántos se permiten a cada uno."""
+        live = self.live()
+        total = sum(live.values())
+        expires_at = time.monotonic() + self.ttl
+        allowed: Dict[str, int] = {}
+        for player, count in counts.items():
+            granted = max(0, min(count, self.max_per_player - live.get(player, 0), self.max_total - total))
+            if granted:
+                self._expires.setdefault(player, deque()).extend([expires_at] * granted)
+                total += granted
+            allowed[player] = granted
+        return allowed
+
+    def stats(self) -> Dict[str, Any]:
+        live = self.live()
+        return {
+            "live": sum(live.values()),
+            "max": self.max_total,
+            "max_per_player": self.max_per_player,
+            "per_player": live,
+        }
+
+command_governor = CommandGovernor(command_classes)
+entity_tracker = EntityTracker(max_live_entities, max_live_entities_per_player, spawned_entity_ttl)
+
+async def reserve_entities(counts: Dict[str, int]) -> Dict[str, int]:
+    """Reserva entidades en el proceso dueño del websocket, que es el único que lleva la cuenta."""
+    if ipc_role == "worker":
+        from core.ipc import bridge_client
+        return await bridge_client.request("reserve_entities", counts=counts)
+    return entity_tracker.reserve(counts)
+
+async def governor_stats() -> Dict[str, Any]:
+    if ipc_role == "worker":
+        from core.ipc import bridge_client
+        return await bridge_client.request("governor_stats")
+    return {"commands": command_governor.stats(), "entities": entity_tracker.stats()}
@@ -0,0 +1,202 @@
+# core/ipc.py
+import asyncio
+import itertools
+import json
+import os
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from core.commands import DetailedCommandResponse, send_minecraft_command
+from core.state import player_data, public_player_state
+from core.telemetry import telemetry_hub
+from core.spatial import player_index
+from core.governor import entity_tracker, governor_stats
+from core.subscriptions import subscription_manager
+from core.positions import position_ages, set_position_ages
+from config.const import ipc_socket_path, ipc_state_sync_interval, reconnect_grace
+
+# Tiempo máximo de espera de una respuesta del puente: algo más que el tiempo límite de un comando (5 s)
+# más lo que puede esperar el puente a que Minecraft se reconecte
+REQUEST_TIMEOUT = 5.0 + reconnect_grace + 1.0
+
+# Protocolo: una línea JSON por mensaje sobre un socket Unix.
+#   petición:  {"id": 1, "op": "command", "command": "...", "wait": true}
+#              {"id": 2, "op": "player_data"}
+#   respuesta: {"id": 1, "result": {...}} (para player_data, {"players": {...}, "position_ages": {...}}) o {"id": 1, "error": {"status_code": 503, "detail": "..."}}
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, default=str) + "\n").encode()
+
+class BridgeServer:
+    """Corre en el proceso dueño del websocket y atiende a los workers HTTP."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        print(f"Puente IPC escuchando en {self.path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        worker_id = f"worker:{id(writer)}"
+
+        async def answer(request: Dict[str, Any]):
+            try:
+                message = {"id": request["id"], "result": await self._execute(request, worker_id)}
+            except HTTPException as e:
+                message = {"id": request["id"], "error": {"status_code": e.status_code, "detail": e.detail, "headers": e.headers}}
+            except Exception as e:
+                # Sin respuesta el worker esperaría hasta su tiempo límite, así que cualquier error se devuelve
+                print(f"Error atendiendo la petición IPC {request.get('op')}: {e}")
+                message = {"id": request.get("id"), "error": {"status_code": 500, "detail": f"Error en el proceso puente: {e}"}}
+            async with write_lock:
+                writer.write(_encode(message))
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                # Cada petición se atiende por separado para que un comando lento no frene a los demás
+                task = asyncio.create_task(answer(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            print(f"Worker desconectado del puente IPC: {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Los eventos que pedía este worker dejan de contar
+            subscription_manager.set_remote_demand(worker_id, [])
+            writer.close()
+
+    async def _execute(self, request: Dict[str, Any], worker_id: str) -> Any:
+        match request.get("op"):
+            case "command":
+                response = await send_minecraft_command(request["command"], wait=request.get("wait", True))
+                if response is None:
+                    return None
+                # Se reenvía el cuerpo completo para no perder campos como `players` de `list`
+                return {"status": response.status, "body": response.body}
+            case "player_data":
+                # Cada sincronización trae los eventos que necesitan los overlays conectados al worker
+                subscription_manager.set_remote_demand(worker_id, request.get("demand", []))
+                # Con la edad de cada posición el worker no vuelve a consultar las que el puente ya tiene al día
+                return {
+                    "players": {name: public_player_state(data) for name, data in list(player_data.items())},
+                    "position_ages": position_ages(),
+                }
+            case "reserve_entities":
+                return entity_tracker.reserve(request["counts"])
+            case "governor_stats":
+                return await governor_stats()
+            case op:
+                raise HTTPException(status_code=400, detail=f"Operación IPC desconocida: {op}")
+
+class BridgeClient:
+    """Corre en cada worker HTTP: reenvía comandos al puente y mantiene una copia de `player_data`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._reader_task: asyncio.Task | None = None
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                raise HTTPException(status_code=503, detail="El proceso con la conexión de Minecraft no está disponible.")
+            self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def _read_responses(self):
+        try:
+            while line := await self._reader.readline():
+                message = json.loads(line)
+                future = self._pending.pop(message["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(HTTPException(**message["error"]))
+                else:
+                    future.set_result(message["result"])
+        finally:
+            # Si el puente se cae, las peticiones en curso fallan en lugar de quedarse colgadas
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(HTTPException(status_code=503, detail="Se perdió la conexión con el proceso de Minecraft."))
+            self._pending.clear()
+            if self._writer is not None:
+                self._writer.close()
+
+    async def request(self, op: str, **payload: Any) -> Any:
+        await self._ensure_connected()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write(_encode({"id": request_id, "op": op, **payload}))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=REQUEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="El proceso con la conexión de Minecraft no respondió a tiempo.")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def send_command(self, command: str, wait: bool = True) -> DetailedCommandResponse | None:
+        result = await self.request("command", command=command, wait=wait)
+        if result is None:
+            return None
+        return DetailedCommandResponse.parse(result)
+
+    async def sync_player_data(self):
+        """Reemplaza la copia local de `player_data` (y la edad de cada posición) por la del puente."""
+        result = await self.request("player_data", demand=subscription_manager.local_demand())
+        remote = result["players"]
+        set_position_ages(result["position_ages"])
+        changed = [name for name, state in remote.items() if player_data.get(name) != state]
+        player_data.clear()
+        player_data.update(remote)
+        player_index.rebuild(player_data)
+        # Los overlays conectados a este worker reciben los cambios copiados del puente
+        for name in changed:
+            telemetry_hub.publish(name)
+
+    async def sync_loop(self, interval: float = ipc_state_sync_interval):
+        try:
+            while True:
+                try:
+                    await self.sync_player_data()
+                except HTTPException as e:
+                    print(f"No se pudo sincronizar el estado con el puente: {e.detail}")
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+bridge_server = BridgeServer(ipc_socket_path)
+bridge_client = BridgeClient(ipc_socket_path)
@@ -0,0 +1,107 @@
+# core/items.py
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+from fastapi import HTTPException
+from core.commands import send_minecraft_command
+from models import ItemRequest
+
+ITEMS_PATH = Path(__file__).resolve().parent.parent / "config" / "items.txt"
+
+# Cantidad máxima que acepta un solo `give` en Bedrock
+MAX_GIVE_AMOUNT = 32767
+
+class ItemRegistry:
+    """Ítems permitidos, cargados una vez de `config/items.txt`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._items: FrozenSet[str] = frozenset()
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            self._items = frozenset(
+                self.normalize(line) for line in f if line.strip() and not line.lstrip().startswith("#")
+            )
+        print(f"Ítems permitidos: {len(self._items)}")
+
+    @staticmethod
+    def normalize(item_id: str) -> str:
+        item_id = item_id.strip().lower()
+        return item_id.removeprefix("minecraft:")
+
+    def __contains__(self, item_id: str) -> bool:
+        return self.normalize(item_id) in self._items
+
+item_registry = ItemRegistry(ITEMS_PATH)
+item_registry.load()
+
+@dataclass
+class ItemStack:
+    """Cantidad total de un ítem para un jugador, tras juntar las entradas repetidas."""
+    player_name: str
+    item_id: str
+    amount: int
+
+def merge_stacks(items: List[ItemRequest], validate: bool = True) -> Tuple[List[ItemStack], List[Dict[str, Any]]]:
+    """
+    Junta las entradas repetidas (mismo jugador e ítem) en una sola y, con `validate`, separa los ítems no permitidos.
+    Devuelve las pilas válidas, en el orden en que aparecieron, y los resultados de las rechazadas.
+    """
+    stacks: Dict[Tuple[str, str], ItemStack] = {}
+    rejected: List[Dict[str, Any]] = []
+    for item in items:
+        if validate and item.item_id not in item_registry:
+            rejected.append({
+                "player_name": item.player_name, "item_id": item.item_id, "amount": item.amount,
+                "status": "invalid_item", "message": f"El ítem {item.item_id} no está permitido.",
+            })
+            continue
+        item_id = item_registry.normalize(item.item_id)
+        key = (item.player_name, item_id)
+        if key in stacks:
+            stacks[key].amount += item.amount
+        else:
+            stacks[key] = ItemStack(item.player_name, item_id, item.amount)
+    return list(stacks.values()), rejected
+
+def _commands(action: str, stack: ItemStack) -> List[str]:
+    if action == "take":
+        # `clear <jugador> <ítem> <data> <cantidad>`: data -1 quita el ítem con cualquier valor de datos
+        return [f'clear "{stack.player_name}" {stack.item_id} -1 {stack.amount}']
+    # `give` no acepta más de MAX_GIVE_AMOUNT de una vez
+    commands = []
+    remaining = stack.amount
+    while remaining > 0:
+        amount = min(remaining, MAX_GIVE_AMOUNT)
+        commands.append(f'give "{stack.player_name}" {stack.item_id} {amount}')
+        remaining -= amount
+    return commands
+
+async def _apply_stack(action: str, stack: ItemStack) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"player_name": stack.player_name, "item_id": stack.item_id, "amount": stack.amount}
+    try:
+        responses = await asyncio.gather(*(send_minecraft_command(command) for command in _commands(action, stack)))
+    except HTTPException as e:
+        return {**result, "status": "error", "status_code": e.status_code, "message": e.detail}
+    failed = next((response for response in responses if response.status != 0), None)
+    if failed is not None:
+        return {**result, "status": "failed", "message": failed.message}
+    return {**result, "status": "ok", "message": responses[-1].message}
+
+async def apply_items(action: str, items: List[ItemRequest], validate: bool = True) -> Dict[str, Any]:
+    """
+    Da (`give`) o quita (`take`) varios ítems a varios jugadores en una sola operación.
+    Todos los comandos se envían a la vez y se espera a sus respuestas juntas.
+    """
+    stacks, rejected = merge_stacks(items, validate)
+    results = list(await asyncio.gather(*(_apply_stack(action, stack) for stack in stacks))) + rejected
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    return {
+        "action": action,
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
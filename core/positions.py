@@ -0,0 +1,139 @@
+# core/positions.py
+import asyncio
+import time
+from typing import Dict, List
+
+from fastapi import HTTPException
+from core.queries import TargetInfo, list_players, query_targets
+from core.state import player_data, mark_online
+from core.telemetry import telemetry_hub
+from core.spatial import player_index
+from core.subscriptions import subscription_manager
+from config.const import position_refresh_interval, position_max_age
+
+_refresh_lock = asyncio.Lock()
+
+# Consumidor de PlayerTransform mientras haya jugadores sin identificar: `querytarget` no devuelve
+# nombres, así que los jugadores nuevos y sus ids solo se conocen por ese evento
+IDENTIFY_CONSUMER = "identify"
+
+# Momento (time.monotonic) en que se recibió la última posición de cada jugador
+_position_times: Dict[str, float] = {}
+
+def mark_position_fresh(player_name: str, age: float = 0.0):
+    _position_times[player_name] = time.monotonic() - age
+
+def position_age(player_name: str) -> float:
+    """Segundos desde la última posición recibida del jugador (infinito si no hay ninguna)."""
+    updated_at = _position_times.get(player_name)
+    return time.monotonic() - updated_at if updated_at is not None else float("inf")
+
+def position_ages() -> Dict[str, float]:
+    """Segundos desde la última posición de cada jugador, para copiarlos a los workers HTTP."""
+    now = time.monotonic()
+    return {name: now - updated_at for name, updated_at in list(_position_times.items())}
+
+def set_position_ages(ages: Dict[str, float]):
+    """Sustituye las edades de las posiciones por las recibidas del puente."""
+    _position_times.clear()
+    for name, age in ages.items():
+        mark_position_fresh(name, age)
+
+def watch_for_unidentified_players(needed: bool = True):
+    if needed:
+        subscription_manager.add_consumer("PlayerTransform", IDENTIFY_CONSUMER)
+    else:
+        subscription_manager.remove_consumer("PlayerTransform", IDENTIFY_CONSUMER)
+
+def _match_targets(targets: List[TargetInfo]) -> Dict[str, TargetInfo]:
+    """
+    Asocia cada objetivo de `querytarget @a` con un jugador del registro.
+    `querytarget` no devuelve el nombre, así que se usa el id conocido por los eventos.
+    """
+    names_by_id = {str(data["id"]): name for name, data in player_data.items() if data.get("id") is not None}
+    matched: Dict[str, TargetInfo] = {}
+    for target in targets:
+        name = names_by_id.get(target.unique_id)
+        if name:
+            matched[name] = target
+    return matched
+
+async def _resolve_by_name(known: Dict[str, TargetInfo]) -> Dict[str, TargetInfo]:
+    """
+    Identifica a los jugadores conectados que el id no permitió asociar (p. ej. varios recién unidos sin
+    ningún PlayerTransform todavía): `list` da sus nombres y un `querytarget "<nombre>"` por cada uno, su objetivo.
+    """
+    online = await list_players()
+    if online is None:
+        return {}
+    names = [name for name in online.players if name not in known]
+    results = await asyncio.gather(*(query_targets(f'"{name}"') for name in names))
+    return {name: targets[0] for name, targets in zip(names, results) if targets}
+
+async def refresh_player_positions() -> int:
+    """
+    Actualiza en bloque la posición de todos los jugadores con un único `querytarget @a`.
+    Con el registro vacío (p. ej. jugadores que ya estaban en el mundo al conectar `/connect`, sin PlayerJoin)
+    se identifican con `list`. Devuelve cuántos jugadores se actualizaron.
+    """
+    # Si ya hay una consulta en curso, se espera a que termine en lugar de enviar otra
+    if _refresh_lock.locked():
+        async with _refresh_lock:
+            return 0
+
+    async with _refresh_lock:
+        targets = await query_targets("@a")
+        if targets is None:
+            return 0
+
+        matched = _match_targets(targets)
+        if len(targets) > len(matched):
+            resolved = await _resolve_by_name(matched)
+            for name, target in resolved.items():
+                # Conectado según el servidor aunque su PlayerJoin no llegara (p. ej. ya estaba al arrancar)
+                player_data.setdefault(name, {"position": None})
+                if target.unique_id is not None:
+                    player_data[name]["id"] = target.unique_id
+            matched.update(resolved)
+
+        for name, target in matched.items():
+            if name not in player_data:
+                continue
+            x, y, z = target.position
+            player_data[name]["position"] = {"x": x, "y": y, "z": z}
+            if target.y_rot is not None:
+                player_data[name]["rotation"] = target.y_rot
+            if target.unique_id is not None:
+                player_data[name].setdefault("id", target.unique_id)
+            player_index.update(name, player_data[name]["position"])
+            mark_position_fresh(name)
+            mark_online(name)
+            telemetry_hub.publish(name)
+
+        unidentified = len(targets) > len(matched) or any(player_data.get(name, {}).get("id") is None for name in matched)
+        watch_for_unidentified_players(unidentified)
+        return len(matched)
+
+async def ensure_player_position(player_name: str, max_age: float = position_max_age) -> Dict | None:
+    """
+    Devuelve la posición del jugador, consultándola al servidor si no se conoce o tiene más de `max_age` segundos.
+    Sin PlayerTransform (nadie lo necesita) la posición guardada puede venir del último refresco periódico.
+    """
+    position = player_data.get(player_name, {}).get("position")
+    if position and position_age(player_name) <= max_age:
+        return position
+
+    await refresh_player_positions()
+    return player_data.get(player_name, {}).get("position")
+
+async def position_refresher(interval: float = position_refresh_interval):
+    """Refresca periódicamente las posiciones mientras haya un cliente conectado."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await refresh_player_positions()
+            except HTTPException as e:
+                print(f"No se pudieron refrescar las posiciones: {e.detail}")
+    except asyncio.CancelledError:
+        pass
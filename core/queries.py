@@ -0,0 +1,71 @@
+# core/queries.py
+import json
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from core.commands import send_minecraft_command
+
+@dataclass(frozen=True)
+class TargetInfo:
+    """Un objetivo devuelto por `querytarget` (no incluye el nombre del jugador)."""
+    unique_id: str | None
+    position: Tuple[float, float, float]
+    y_rot: float | None
+    dimension: int | None
+
+@dataclass(frozen=True)
+class PlayerList:
+    """Resultado de `list`."""
+    current: int
+    max: int
+    players: List[str]
+
+async def test_for_block(x: int, y: int, z: int, block: str) -> bool:
+    """`testforblock`: True si el bloque coincide. Solo se mira el código de estado, sin decodificar la respuesta."""
+    response = await send_minecraft_command(f"testforblock {x} {y} {z} {block}")
+    return response is not None and response.status == 0
+
+def parse_targets(details: str | None) -> List[TargetInfo]:
+    """Convierte el campo `details` de `querytarget` en objetivos tipados; ignora entradas incompletas."""
+    if not details:
+        return []
+    try:
+        raw_targets = json.loads(details)
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(raw_targets, list):
+        return []
+
+    targets: List[TargetInfo] = []
+    for target in raw_targets:
+        position = target.get("position") if isinstance(target, dict) else None
+        if not position:
+            continue
+        unique_id = target.get("uniqueId")
+        targets.append(TargetInfo(
+            unique_id=str(unique_id) if unique_id is not None else None,
+            position=(position["x"], position["y"], position["z"]),
+            y_rot=target.get("yRot"),
+            dimension=target.get("dimension"),
+        ))
+    return targets
+
+async def query_targets(selector: str = "@a") -> List[TargetInfo] | None:
+    """`querytarget`: objetivos del selector, o None si el comando falló."""
+    response = await send_minecraft_command(f"querytarget {selector}")
+    if response is None or response.status != 0:
+        return None
+    return parse_targets(response.details)
+
+async def list_players() -> PlayerList | None:
+    """`list`: jugadores conectados según el servidor, o None si el comando falló."""
+    response = await send_minecraft_command("list")
+    if response is None or response.status != 0:
+        return None
+    body = response.body
+    names = body.get("players") or ""
+    return PlayerList(
+        current=int(body.get("currentPlayerCount", 0)),
+        max=int(body.get("maxPlayerCount", 0)),
+        players=[name.strip() for name in names.split(",") if name.strip()],
+    )
@@ -0,0 +1,188 @@
+# core/random_events.py
+import asyncio
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from core.commands import send_minecraft_command
+from core.event_log import background_task
+from core.positions import ensure_player_position
+from core.spatial import player_index
+from core.state import player_data, online_players
+from core.tracing import tracer
+from models import MobRequest, TeleportRequest
+from utils.alias_table import AliasTable
+from utils.teleport_search import RANDOM_TELEPORT_RANGE, find_safe_y, minecraft_blocks
+from config.const import random_events
+
+# Segundos que se espera a que el área de carga (tickingarea) tenga los chunks listos antes de explorarlos
+TICKING_AREA_WAIT = 2.0
+
+# Estrategias para elegir al jugador afectado: reciben al dueño del cronómetro y devuelven un nombre
+TargetStrategy = Callable[[str], str]
+
+def _target_owner(owner: str) -> str:
+    return owner
+
+def _target_random(owner: str) -> str:
+    return random.choice(online_players() or [owner])
+
+def _target_nearest(owner: str) -> str:
+    position = player_index.position(owner)
+    if position is None:
+        return owner
+    nearest = player_index.nearest(*position, k=1, exclude={owner})
+    return nearest[0] if nearest else owner
+
+target_strategies: Dict[str, TargetStrategy] = {
+    "owner": _target_owner,
+    "random": _target_random,
+    "nearest": _target_nearest,
+}
+
+@dataclass(frozen=True)
+class RandomEvent:
+    """Evento registrado una sola vez: cómo se prepara, cómo se ejecuta y a quién afecta."""
+    name: str
+    command: str
+    target: TargetStrategy
+    username: str
+    # Construye el modelo de la petición (p. ej. el MobRequest con el mob ya sorteado)
+    build_request: Callable[[], Any]
+    # Paso costoso opcional que se adelanta durante la cuenta atrás
+    warmup: Callable[["PreparedEvent"], Awaitable[Any]] | None = None
+
+@dataclass
+class PreparedEvent:
+    """Una ejecución concreta de un evento. Cada cronómetro tiene la suya, sin estado compartido."""
+    event: RandomEvent
+    owner: str
+    target: str
+    request: Any
+    warmup_task: asyncio.Task | None = field(default=None, repr=False)
+
+    def warm_result(self) -> Any:
+        """Resultado del paso adelantado si ya terminó bien; si no, None (se usa el camino normal)."""
+        task = self.warmup_task
+        if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    def cancel(self):
+        if self.warmup_task is not None and not self.warmup_task.done():
+            self.warmup_task.cancel()
+
+async def _scout_teleport(prepared: PreparedEvent) -> Dict[str, Any] | None:
+    """
+    Busca con antelación un destino seguro para el teletransporte.
+    Un área de carga temporal mantiene los chunks del destino cargados mientras se consultan los bloques.
+    """
+    origin = await ensure_player_position(prepared.target)
+    if not origin:
+        return None
+    x = int(origin["x"] + random.randint(-RANDOM_TELEPORT_RANGE, RANDOM_TELEPORT_RANGE))
+    z = int(origin["z"] + random.randint(-RANDOM_TELEPORT_RANGE, RANDOM_TELEPORT_RANGE))
+    area = f"evento_{uuid.uuid4().hex[:8]}"
+    response = await send_minecraft_command(f"tickingarea add circle {x} 0 {z} 1 {area} true")
+    if response is None or response.status != 0:
+        # Bedrock admite unas 10 áreas de carga por mundo; sin ella los chunks no están cargados
+        # y la búsqueda no valdría, así que se deja para el camino normal al ejecutar el evento
+        print(f"No se pudo crear el área de carga para preparar el teletransporte: {response.message if response else 'sin respuesta'}")
+        return None
+    try:
+        await asyncio.sleep(TICKING_AREA_WAIT)
+        search = await find_safe_y(minecraft_blocks, x, z)
+    finally:
+        await send_minecraft_command(f"tickingarea remove {area}", wait=False)
+    if search.y is None:
+        return None
+    print(f"Destino del teletransporte preparado para {prepared.target}: {search.x}, {search.y}, {search.z} ({search.probes} consultas)")
+    return {"origin": origin, "x": search.x, "y": search.y, "z": search.z}
+
+async def _run_spawn_mob(prepared: PreparedEvent):
+    from api.routes import spawn_mob_at_player
+    await spawn_mob_at_player(prepared.request, player_name=prepared.target, username=prepared.event.username)
+
+async def _run_teleport(prepared: PreparedEvent):
+    from api.routes import teleport_player, teleport_to
+    scouted = prepared.warm_result()
+    if scouted is None:
+        # Sin destino preparado se hace la búsqueda completa como en la ruta
+        await teleport_player(prepared.request, player_name=prepared.target, username=prepared.event.username)
+        return
+    await teleport_to(prepared.target, scouted["origin"], scouted["x"], scouted["y"], scouted["z"], prepared.event.username)
+
+async def _run_roulette_effect(prepared: PreparedEvent):
+    from api.routes import roulette_effect
+    await roulette_effect(player_name=prepared.target, username=prepared.event.username)
+
+# Ejecutor y paso adelantado de cada tipo de evento
+_event_runners: Dict[str, Tuple[Callable[[PreparedEvent], Awaitable[None]], Callable[[PreparedEvent], Awaitable[Any]] | None]] = {
+    "spawn_mob_at_player": (_run_spawn_mob, None),
+    "teleport_player": (_run_teleport, _scout_teleport),
+    "roulette_effect": (_run_roulette_effect, None),
+}
+
+def _request_builder(config: Dict[str, Any]) -> Callable[[], Any]:
+    match config["command"]:
+        case "spawn_mob_at_player":
+            mob_types = tuple(config.get("mob_types") or ("zombie",))
+            low, high = config.get("quantity", (1, 5))
+            return lambda: MobRequest(mob_type=random.choice(mob_types), quantity=random.randint(low, high), r=1)
+        case "teleport_player":
+            # Sin coordenadas: el destino se elige al azar en la ruta o al prepararlo
+            request = TeleportRequest()
+            return lambda: request
+        case _:
+            return lambda: None
+
+class RandomEventPipeline:
+    """
+    Eventos aleatorios del cronómetro.
+    Se registran una vez con sus pesos; cada cronómetro prepara su evento durante la cuenta atrás
+    (sorteo, jugador, petición y, si lo hay, el paso costoso) y al llegar a cero solo lo ejecuta.
+    """
+
+    def __init__(self, configs: List[Dict[str, Any]]):
+        events: List[RandomEvent] = []
+        for config in configs:
+            if config["command"] not in _event_runners:
+                raise ValueError(f"Evento '{config['name']}' con comando desconocido: {config['command']}")
+            _, warmup = _event_runners[config["command"]]
+            events.append(RandomEvent(
+                name=config["name"],
+                command=config["command"],
+                target=target_strategies[config.get("target", "random")],
+                username=config.get("username", "Cronometro"),
+                build_request=_request_builder(config),
+                warmup=warmup,
+            ))
+        self.events = events
+        self._table = AliasTable(events, [config.get("weight", 1) for config in configs])
+
+    def prepare(self, owner: str, warm: bool = True) -> PreparedEvent:
+        """Sortea el evento y su jugador, y lanza en segundo plano el paso adelantado."""
+        event = self._table.draw()
+        prepared = PreparedEvent(event=event, owner=owner, target=event.target(owner), request=event.build_request())
+        if warm and event.warmup is not None:
+            prepared.warmup_task = background_task(event.warmup(prepared))
+        return prepared
+
+    async def fire(self, prepared: PreparedEvent):
+        run, _ = _event_runners[prepared.event.command]
+        # Los eventos del cronómetro no pasan por HTTP, así que abren su propia traza
+        with tracer.span("random_event", root=True, **{"event.name": prepared.event.name, "event.owner": prepared.owner}) as span:
+            try:
+                # Si el jugador elegido se fue durante la cuenta atrás, el evento le toca al dueño
+                if prepared.target not in player_data:
+                    prepared.cancel()
+                    prepared.warmup_task = None
+                    prepared.target = prepared.owner
+                span.set("event.target", prepared.target)
+                span.set("event.prewarmed", prepared.warm_result() is not None)
+                await run(prepared)
+            finally:
+                prepared.cancel()
+
+random_event_pipeline = RandomEventPipeline(random_events)
@@ -0,0 +1,119 @@
+# core/roulettes.py
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+from pydantic import ValidationError
+
+from models import RouletteOption, RouletteRequest
+from utils.alias_table import AliasTable
+from config.const import title_colors, effects, bad_effects
+
+ROULETTES_PATH = Path(__file__).resolve().parent.parent / "config" / "roulettes.yaml"
+
+@dataclass(frozen=True)
+class CompiledRoulette:
+    """Ruleta validada y lista para sortear: tabla de alias y títulos del giro precalculados."""
+    options: List[RouletteOption]
+    table: AliasTable[RouletteOption]
+    spin_titles: List[str]
+
+    def draw(self) -> RouletteOption:
+        return self.table.draw()
+
+def compile_roulette(request: RouletteRequest) -> CompiledRoulette:
+    """Compila una ruleta. Lanza ValueError si los pesos no permiten sortear."""
+    options = list(request.options)
+    return CompiledRoulette(
+        options=options,
+        table=AliasTable(options, [option.weight for option in options]),
+        spin_titles=[f"{option.color}{option.name}" for option in options],
+    )
+
+def _compile_effect_roulette() -> CompiledRoulette:
+    """
+    Compila la ruleta de efectos a partir de `config.const.effects`.
+    El comando queda como plantilla; duración, amplificador y color se eligen solo para el ganador.
+    """
+    options = [
+        RouletteOption(name=name, command=f"effect {{player}} {effect} {{duration}} {{amplifier}}", color="", is_bad=effect in bad_effects)
+        for effect, name in effects.items()
+    ]
+    return CompiledRoulette(
+        options=options,
+        table=AliasTable(options, [option.weight for option in options]),
+        spin_titles=[f"{color}{option.name}" for option in options for color in title_colors],
+    )
+
+effect_roulette = _compile_effect_roulette()
+
+def draw_effect(player_name: str) -> RouletteOption:
+    """Sortea un efecto de la ruleta de efectos y completa su comando para el jugador."""
+    template = effect_roulette.draw()
+    duration = random.randint(30, 90)
+    amplifier = random.randint(1, 5)
+    return template.model_copy(update={
+        "command": template.command.format(player=player_name, duration=duration, amplifier=amplifier),
+        "duration": duration,
+        "color": random.choice(title_colors),
+    })
+
+class RouletteRegistry:
+    """
+    Ruletas definidas en `config/roulettes.yaml`, compiladas una sola vez.
+    Si el archivo cambia se vuelven a compilar en la siguiente consulta, sin reiniciar el servidor.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._roulettes: Dict[str, CompiledRoulette] = {}
+        self._mtime: float | None = None
+
+    def load(self):
+        """Lee y compila todas las ruletas. Si alguna no es válida se conservan las anteriores."""
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        if not isinstance(data, dict):
+            raise ValueError("El archivo de ruletas debe ser un mapa con la clave 'roulettes'.")
+        roulettes = data.get("roulettes") or {}
+        if not isinstance(roulettes, dict):
+            raise ValueError("'roulettes' debe ser un mapa de nombre a ruleta.")
+
+        compiled: Dict[str, CompiledRoulette] = {}
+        for name, definition in roulettes.items():
+            try:
+                compiled[name] = compile_roulette(RouletteRequest.model_validate(definition))
+            except (ValidationError, ValueError) as e:
+                raise ValueError(f"Ruleta '{name}' no válida: {e}") from e
+
+        self._roulettes = compiled
+        self._mtime = mtime
+        print(f"Ruletas cargadas: {', '.join(compiled) or 'ninguna'}")
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            try:
+                self.load()
+            except (OSError, yaml.YAMLError, ValueError) as e:
+                # Se marca como vista para no reintentar en cada petición hasta el próximo cambio
+                self._mtime = mtime
+                print(f"No se pudieron recargar las ruletas: {e}")
+
+    def get(self, name: str) -> CompiledRoulette | None:
+        self._reload_if_changed()
+        return self._roulettes.get(name)
+
+    def names(self) -> List[str]:
+        self._reload_if_changed()
+        return list(self._roulettes)
+
+roulette_registry = RouletteRegistry(ROULETTES_PATH)
+roulette_registry.load()
@@ -0,0 +1,140 @@
+# core/snapshots.py
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from core.state import player_data, player_online_hooks, public_player_state
+from core.spatial import player_index
+from utils.timer import send_countdown_timer
+from config.const import snapshot_path, snapshot_interval
+
+# Cronómetros restaurados que esperan a que se conecte un cliente para reanudarse
+pending_timers: Dict[str, Dict] = {}
+
+def _serialize_player(data: Dict) -> str:
+    return json.dumps(public_player_state(data), sort_keys=True, default=str)
+
+class SnapshotStore:
+    """
+    Guarda el registro de jugadores en SQLite de forma incremental: solo se escriben
+    los jugadores cuyo estado cambió desde la última instantánea.
+    Toda la E/S se hace en un hilo aparte para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._written: Dict[str, str] = {}
+        # Cancelar la tarea que espera a `to_thread` no detiene el hilo: el cerrojo evita que dos
+        # escrituras (p. ej. la periódica y la final al apagar) usen la conexión a la vez
+        self._io_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS players (name TEXT PRIMARY KEY, data TEXT NOT NULL, saved_at REAL NOT NULL)")
+        return self._conn
+
+    def _write(self, upserts: List[Tuple[str, str, float]], deletes: List[str]):
+        with self._io_lock:
+            self._write_locked(upserts, deletes)
+
+    def _write_locked(self, upserts: List[Tuple[str, str, float]], deletes: List[str]):
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO players (name, data, saved_at) VALUES (?, ?, ?)", upserts)
+            conn.executemany("DELETE FROM players WHERE name = ?", [(name,) for name in deletes])
+
+    def _read(self) -> List[Tuple[str, str, float]]:
+        with self._io_lock:
+            return self._connect().execute("SELECT name, data, saved_at FROM players").fetchall()
+
+    async def save(self) -> int:
+        """Escribe los cambios desde la última instantánea. Devuelve cuántas filas cambiaron."""
+        # La serialización se hace en el bucle para capturar un estado consistente; es barata
+        now = time.time()
+        current = {name: _serialize_player(data) for name, data in list(player_data.items())}
+        upserts = [(name, state, now) for name, state in current.items() if self._written.get(name) != state]
+        deletes = [name for name in self._written if name not in current]
+        if not upserts and not deletes:
+            return 0
+
+        await asyncio.to_thread(self._write, upserts, deletes)
+        self._written = current
+        return len(upserts) + len(deletes)
+
+    async def restore(self) -> int:
+        """
+        Carga la última instantánea en `player_data`. Los jugadores quedan sin posición y marcados como `offline`,
+        y sus cronómetros pendientes de reanudar.
+        """
+        rows = await asyncio.to_thread(self._read)
+        now = time.time()
+        for name, state, saved_at in rows:
+            data = json.loads(state)
+            self._written[name] = state
+            timer = data.get("timer")
+            if timer is not None:
+                if timer.get("is_running"):
+                    # Se descuenta el tiempo que el servidor estuvo detenido
+                    elapsed = int(now - saved_at)
+                    timer["remaining_time"] = max(0, timer.get("remaining_time", 0) - elapsed)
+                    pending_timers[name] = timer
+                timer["is_running"] = False
+                timer["task"] = None
+            # Hasta que un PlayerJoin, PlayerTransform o `querytarget` lo confirme, el jugador puede no estar
+            # conectado y su última posición guardada ya no vale
+            data["position"] = None
+            data["offline"] = True
+            player_data.setdefault(name, {}).update(data)
+        player_index.rebuild(player_data)
+        return len(rows)
+
+    def close(self):
+        with self._io_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+snapshot_store = SnapshotStore(snapshot_path)
+
+def resume_timers(names: List[str] | None = None) -> List[str]:
+    """
+    Reanuda los cronómetros restaurados de los jugadores ya confirmados como conectados.
+    Se llama cuando hay un cliente conectado y cuando se confirma un jugador restaurado;
+    los de jugadores aún `offline` siguen pendientes.
+    """
+    resumed = []
+    for name in list(pending_timers if names is None else names):
+        if name not in pending_timers or player_data.get(name, {}).get("offline"):
+            continue
+        saved = pending_timers.pop(name)
+        timer_data = player_data.get(name, {}).get("timer")
+        if timer_data is None or timer_data.get("is_running"):
+            continue
+        timer_data["is_running"] = True
+        timer_data["remaining_time"] = saved["remaining_time"]
+        timer_data["task"] = asyncio.create_task(send_countdown_timer(saved["remaining_time"], player_data, name))
+        resumed.append(name)
+    if resumed:
+        print(f"Cronómetros reanudados: {', '.join(resumed)}")
+    return resumed
+
+player_online_hooks.append(lambda name: resume_timers([name]))
+
+async def snapshot_loop(interval: float = snapshot_interval):
+    """Guarda instantáneas periódicas hasta que se cancela."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await snapshot_store.save()
+            except sqlite3.Error as e:
+                print(f"No se pudo guardar la instantánea: {e}")
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,119 @@
+# core/spatial.py
+import heapq
+import math
+from typing import Dict, List, Set, Tuple
+
+Cell = Tuple[int, int]
+
+class PlayerGrid:
+    """
+    Índice espacial de jugadores en una cuadrícula (por defecto del tamaño de un chunk).
+    Se actualiza de forma incremental con cada movimiento y responde consultas por radio
+    y de los k más cercanos sin recorrer a todos los jugadores.
+    """
+
+    def __init__(self, cell_size: int = 16):
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._positions: Dict[str, Tuple[float, float, float]] = {}
+        self._player_cells: Dict[str, Cell] = {}
+
+    def _cell(self, x: float, z: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+
+    def update(self, name: str, position: Dict | None):
+        if not position:
+            self.remove(name)
+            return
+        point = (position["x"], position["y"], position["z"])
+        cell = self._cell(point[0], point[2])
+        old_cell = self._player_cells.get(name)
+        if old_cell != cell:
+            if old_cell is not None:
+                self._discard(name, old_cell)
+            self._cells.setdefault(cell, set()).add(name)
+            self._player_cells[name] = cell
+        self._positions[name] = point
+
+    def remove(self, name: str):
+        cell = self._player_cells.pop(name, None)
+        if cell is not None:
+            self._discard(name, cell)
+        self._positions.pop(name, None)
+
+    def _discard(self, name: str, cell: Cell):
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(name)
+            if not members:
+                del self._cells[cell]
+
+    def rebuild(self, player_data: Dict[str, Dict]):
+        """Reconstruye el índice completo (tras restaurar o copiar el registro)."""
+        self._cells.clear()
+        self._positions.clear()
+        self._player_cells.clear()
+        for name, data in player_data.items():
+            self.update(name, data.get("position"))
+
+    def position(self, name: str) -> Tuple[float, float, float] | None:
+        return self._positions.get(name)
+
+    def _distance_sq(self, name: str, x: float, y: float, z: float) -> float:
+        px, py, pz = self._positions[name]
+        return (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+
+    def within(self, x: float, y: float, z: float, radius: float) -> List[str]:
+        """Jugadores a `radius` bloques o menos del punto, ordenados por distancia."""
+        min_cx, min_cz = self._cell(x - radius, z - radius)
+        max_cx, max_cz = self._cell(x + radius, z + radius)
+        radius_sq = radius * radius
+        found: List[Tuple[float, str]] = []
+
+        # Si el área cubre más celdas de las que hay ocupadas, es más barato recorrer las ocupadas
+        if (max_cx - min_cx + 1) * (max_cz - min_cz + 1) > len(self._cells):
+            candidates = (name for (cx, cz), members in self._cells.items()
+                          if min_cx <= cx <= max_cx and min_cz <= cz <= max_cz for name in members)
+        else:
+            candidates = (name for cx in range(min_cx, max_cx + 1) for cz in range(min_cz, max_cz + 1)
+                          for name in self._cells.get((cx, cz), ()))
+
+        for name in candidates:
+            distance_sq = self._distance_sq(name, x, y, z)
+            if distance_sq <= radius_sq:
+                found.append((distance_sq, name))
+        return [name for _, name in sorted(found)]
+
+    def nearest(self, x: float, y: float, z: float, k: int = 1, exclude: Set[str] | None = None) -> List[str]:
+        """Los `k` jugadores más cercanos al punto, buscando en anillos de celdas crecientes."""
+        exclude = exclude or set()
+        available = len(self._positions) - len(exclude & self._positions.keys())
+        k = min(k, available)
+        if k <= 0:
+            return []
+
+        center_x, center_z = self._cell(x, z)
+        best: List[Tuple[float, str]] = []  # montículo de máximos con (-distancia², nombre)
+        ring = 0
+        max_ring = max((max(abs(cx - center_x), abs(cz - center_z)) for cx, cz in self._cells), default=0)
+        while ring <= max_ring:
+            for cx in range(center_x - ring, center_x + ring + 1):
+                for cz in range(center_z - ring, center_z + ring + 1):
+                    # Solo el borde del anillo, el interior ya se visitó
+                    if max(abs(cx - center_x), abs(cz - center_z)) != ring:
+                        continue
+                    for name in self._cells.get((cx, cz), ()):
+                        if name in exclude:
+                            continue
+                        item = (-self._distance_sq(name, x, y, z), name)
+                        if len(best) < k:
+                            heapq.heappush(best, item)
+                        elif item > best[0]:
+                            heapq.heapreplace(best, item)
+            # Cualquier jugador fuera de este anillo está al menos a `ring * cell_size` bloques
+            if len(best) == k and -best[0][0] <= (ring * self.cell_size) ** 2:
+                break
+            ring += 1
+        return [name for _, name in sorted(best, key=lambda item: -item[0])]
+
+player_index = PlayerGrid()
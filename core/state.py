@@ -1,11 +1,37 @@
 # core/state.py
 import asyncio
-from typing import Dict, List
+from typing import TYPE_CHECKING, Callable, Dict, List
 from fastapi import WebSocket
-from bedrock.events import GameEvent
+
+if TYPE_CHECKING:
+    from core.game_events import GameEvent
 
 # Variables Globales
 player_data: Dict[str, Dict] = {}
 active_connections: List[WebSocket] = []
 command_requests: Dict[str, asyncio.Future] = {}
-game_event_handlers: List[GameEvent] = []
\ No newline at end of file
+game_event_handlers: List["GameEvent"] = []
+# Se llaman con el nombre del jugador cuando se confirma que uno marcado como `offline` está conectado
+player_online_hooks: List[Callable[[str], None]] = []
+
+# Claves del cronómetro que se pueden exponer o guardar (la tarea de asyncio no es serializable)
+TIMER_KEYS = ("is_running", "remaining_time", "initial_duration", "mode")
+
+def online_players() -> List[str]:
+    """Jugadores conectados: excluye los restaurados de una instantánea que el servidor aún no ha confirmado."""
+    return [name for name, data in list(player_data.items()) if not data.get("offline")]
+
+def mark_online(player_name: str):
+    """Quita la marca `offline` del jugador (PlayerJoin, PlayerTransform o `querytarget`) y avisa a los hooks."""
+    data = player_data.get(player_name)
+    if data is None or data.pop("offline", None) is None:
+        return
+    for hook in player_online_hooks:
+        hook(player_name)
+
+def public_player_state(data: Dict) -> Dict:
+    """Copia serializable del estado de un jugador (sin la tarea del cronómetro)."""
+    state = {key: value for key, value in data.items() if key != "timer"}
+    if "timer" in data:
+        state["timer"] = {key: data["timer"][key] for key in TIMER_KEYS if key in data["timer"]}
+    return state
@@ -0,0 +1,130 @@
+# core/subscriptions.py
+import asyncio
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Set
+
+from core.state import game_event_handlers
+from config.const import always_subscribed_events, subscription_sync_delay
+
+def _subscription_message(purpose: str, event_name: str) -> str:
+    return json.dumps({
+        "header": {
+            "version": 1,
+            "requestId": str(uuid.uuid4()),
+            "messagePurpose": purpose,
+            "messageType": "commandRequest"
+        },
+        "body": {
+            "eventName": event_name,
+        },
+    })
+
+class SubscriptionManager:
+    """
+    Suscripciones a eventos del cliente de Minecraft según la demanda.
+    Cada evento se suscribe solo mientras tenga algún consumidor (o esté en `always`), de modo que
+    los eventos muy frecuentes como PlayerTransform dejan de llegar cuando nadie necesita posiciones.
+    Al reconectarse, las suscripciones se vuelven a enviar desde cero.
+    """
+
+    def __init__(self, always: Iterable[str], sync_delay: float = 0.2):
+        self.always = set(always)
+        self.sync_delay = sync_delay
+        self._consumers: Dict[str, Set[str]] = {}
+        self._remote: Dict[str, Set[str]] = {}
+        self._subscribed: Set[str] = set()
+        self._websocket: Any = None
+        self._lock = asyncio.Lock()
+        self._sync_task: asyncio.Task | None = None
+
+    def available(self) -> Set[str]:
+        """Eventos con algún handler registrado."""
+        return {event.name for event in game_event_handlers}
+
+    def add_consumer(self, event_name: str, consumer: str):
+        consumers = self._consumers.setdefault(event_name, set())
+        if consumer not in consumers:
+            consumers.add(consumer)
+            self.request_sync()
+
+    def remove_consumer(self, event_name: str, consumer: str):
+        consumers = self._consumers.get(event_name)
+        if consumers and consumer in consumers:
+            consumers.discard(consumer)
+            if not consumers:
+                del self._consumers[event_name]
+            self.request_sync()
+
+    def set_remote_demand(self, owner: str, events: Iterable[str]):
+        """Demanda de otro proceso (un worker HTTP); reemplaza la anterior de ese mismo dueño."""
+        events = set(events)
+        if self._remote.get(owner, set()) == events:
+            return
+        if events:
+            self._remote[owner] = events
+        else:
+            self._remote.pop(owner, None)
+        self.request_sync()
+
+    def local_demand(self) -> List[str]:
+        return sorted(self._consumers)
+
+    def desired(self) -> Set[str]:
+        demanded = set(self._consumers).union(*self._remote.values())
+        return self.available() & (self.always | demanded)
+
+    def request_sync(self):
+        """Programa una sincronización; los cambios de los próximos `sync_delay` segundos se envían juntos."""
+        if self._websocket is None or (self._sync_task is not None and not self._sync_task.done()):
+            return
+        self._sync_task = asyncio.get_running_loop().create_task(self._delayed_sync())
+
+    async def _delayed_sync(self):
+        await asyncio.sleep(self.sync_delay)
+        # A partir de aquí, cualquier cambio nuevo programa otra sincronización
+        self._sync_task = None
+        await self.sync()
+
+    async def sync(self):
+        """Envía las suscripciones y desuscripciones que faltan para llegar a la demanda actual."""
+        async with self._lock:
+            websocket = self._websocket
+            if websocket is None:
+                return
+            desired = self.desired()
+            # Todos los mensajes se preparan de una vez y se envían seguidos
+            messages = [_subscription_message("subscribe", name) for name in sorted(desired - self._subscribed)]
+            messages += [_subscription_message("unsubscribe", name) for name in sorted(self._subscribed - desired)]
+            if not messages:
+                return
+            try:
+                for message in messages:
+                    await websocket.send_text(message)
+            except Exception as e:
+                print(f"No se pudieron actualizar las suscripciones: {e}")
+                return
+            added, removed = desired - self._subscribed, self._subscribed - desired
+            self._subscribed = desired
+            print(f"Suscripciones actualizadas: +{sorted(added)} -{sorted(removed)}")
+
+    async def attach(self, websocket: Any):
+        """Nuevo cliente (o reconexión): parte de cero y se suscribe a todo lo que se necesita ahora."""
+        self._websocket = websocket
+        self._subscribed = set()
+        await self.sync()
+
+    def detach(self, websocket: Any):
+        if self._websocket is websocket:
+            self._websocket = None
+            self._subscribed = set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribed": sorted(self._subscribed),
+            "desired": sorted(self.desired()),
+            "consumers": {name: sorted(consumers) for name, consumers in self._consumers.items()},
+            "remote": {owner: sorted(events) for owner, events in self._remote.items()},
+        }
+
+subscription_manager = SubscriptionManager(always_subscribed_events, subscription_sync_delay)
@@ -0,0 +1,75 @@
+# core/telemetry.py
+import asyncio
+import json
+from typing import AsyncIterator, Dict, Set
+
+from core.state import player_data, public_player_state
+from core.subscriptions import subscription_manager
+
+# Segundos sin datos tras los que se envía un comentario para mantener viva la conexión
+HEARTBEAT_INTERVAL = 15.0
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+class TelemetrySubscriber:
+    """
+    Un cliente del stream. Guarda solo el último cambio de cada jugador, así que si el cliente
+    pide menos actualizaciones por segundo de las que llegan, los intermedios se descartan.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._pending: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, player_name: str, frame: str):
+        self._pending[player_name] = frame
+        self._ready.set()
+
+    async def frames(self) -> AsyncIterator[str]:
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            self._ready.clear()
+            pending, self._pending = self._pending, {}
+            yield "".join(pending.values())
+            await asyncio.sleep(self.min_interval)
+
+class TelemetryHub:
+    """Reparte los cambios de los jugadores entre los suscriptores. Cada cambio se serializa una sola vez."""
+
+    def __init__(self):
+        self._subscribers: Set[TelemetrySubscriber] = set()
+
+    def publish(self, player_name: str):
+        if not self._subscribers or player_name not in player_data:
+            return
+        state = public_player_state(player_data[player_name])
+        frame = _sse("player", {"player": player_name, **state})
+        for subscriber in self._subscribers:
+            subscriber.offer(player_name, frame)
+
+    async def stream(self, min_interval: float) -> AsyncIterator[str]:
+        subscriber = TelemetrySubscriber(min_interval)
+        self._subscribers.add(subscriber)
+        # Los overlays necesitan las posiciones en tiempo real
+        consumer = f"overlay:{id(subscriber)}"
+        subscription_manager.add_consumer("PlayerTransform", consumer)
+        try:
+            # Primero el estado completo, después solo los cambios
+            yield _sse("snapshot", {name: public_player_state(data) for name, data in list(player_data.items())})
+            async for chunk in subscriber.frames():
+                yield chunk
+        finally:
+            self._subscribers.discard(subscriber)
+            subscription_manager.remove_consumer("PlayerTransform", consumer)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+telemetry_hub = TelemetryHub()
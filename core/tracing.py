@@ -0,0 +1,198 @@
+# core/tracing.py
+import contextvars
+import json
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List
+
+from core.event_log import EventLog
+from config.const import trace_path, trace_format, trace_history
+
+SERVICE_NAME = "minecraft_channel_points"
+
+class Span:
+    """Un tramo de una traza: nombre, inicio y fin (ns desde la época), padre y atributos."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 2 if self.parent_id is None else 1,  # SERVER para la raíz, INTERNAL para el resto
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NoopSpan:
+    """Tramo que no registra nada, para código que corre fuera de una traza."""
+
+    def set(self, key: str, value: Any):
+        pass
+
+_noop_span = _NoopSpan()
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+class Trace:
+    """Todos los tramos de una redención (o de un evento del cronómetro)."""
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self.finished = False
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "duration_ms": round(self.duration_ms, 3),
+            "spans": [span.to_json() for span in self.spans],
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in self.spans]}],
+        }]}
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+class Tracer:
+    """
+    Trazas ligeras en memoria. Cada redención abre un tramo raíz y todo lo que se ejecuta dentro
+    (incluidas las tareas creadas con `gather`) cuelga de él a través de un ContextVar.
+    Las trazas terminadas se guardan en un historial acotado y, si hay archivo, se exportan en JSON u OTLP.
+    """
+
+    def __init__(self, path: str, export_format: str = "otlp", history: int = 200):
+        self.export_format = export_format
+        self._sink = EventLog(path)
+        self._recent: Deque[Trace] = deque(maxlen=history)
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        """
+        Abre un tramo hijo del actual. Sin tramo actual no se registra nada,
+        salvo que `root` sea True, en cuyo caso empieza una traza nueva.
+        """
+        parent = _current_span.get()
+        if parent is None or parent.trace.finished:
+            if not root:
+                yield _noop_span
+                return
+            parent = None
+
+        trace = parent.trace if parent is not None else Trace()
+        span = Span(trace, name, parent.span_id if parent is not None else None, attributes)
+        trace.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {getattr(e, 'detail', e)}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if parent is None:
+                self._finish(trace)
+
+    def annotate(self, key: str, value: Any):
+        """Añade un atributo al tramo actual, si lo hay."""
+        span = _current_span.get()
+        if span is not None:
+            span.set(key, value)
+
+    def current_trace_id(self) -> str | None:
+        span = _current_span.get()
+        return span.trace.trace_id if span is not None else None
+
+    def _finish(self, trace: Trace):
+        trace.finished = True
+        self._recent.append(trace)
+        if self._sink.enabled:
+            data = trace.to_otlp() if self.export_format == "otlp" else trace.to_json()
+            self._sink.append(json.dumps(data, ensure_ascii=False, default=str))
+
+    def slowest(self, limit: int = 10) -> List[Trace]:
+        return sorted(self._recent, key=lambda trace: trace.duration_ms, reverse=True)[:limit]
+
+    async def flush(self):
+        await self._sink.flush()
+
+tracer = Tracer(trace_path, trace_format, trace_history)
+
+class TracingMiddleware:
+    """Middleware ASGI que abre una traza por cada redención (petición POST) y devuelve su id en `X-Trace-Id`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.span(f"POST {scope['path']}", root=True, **{"http.method": "POST", "http.target": scope["path"]}) as span:
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    span.set("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.error = f"HTTP {message['status']}"
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-trace-id", span.trace.trace_id.encode())]}
+                await send(message)
+
+            await self.app(scope, receive, traced_send)
@@ -0,0 +1,231 @@
+# core/waves.py
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException
+from core.commands import send_minecraft_command
+from core.event_log import background_task, capture_redemption
+from core.governor import command_governor, reserve_entities
+from core.positions import refresh_player_positions
+from core.state import player_data, online_players
+from core.tracing import tracer
+from models import WaveAction, WaveRequest
+from utils.spawn_placement import find_spawn_points
+from utils.teleport_search import spread_command
+from config.const import (
+    title_colors, transient_mob_types,
+    wave_commands_per_tick, wave_tick_seconds, wave_max_in_flight, wave_history,
+)
+
+@dataclass(frozen=True)
+class WaveCommand:
+    player: str
+    kind: str
+    command: str
+
+@dataclass
+class WaveReport:
+    """Estado e informe de una oleada. Los tiempos están en milisegundos."""
+    id: str
+    name: str
+    status: str = "scheduled"
+    starts_at: float = 0.0
+    players: List[str] = field(default_factory=list)
+    # Jugadores pedidos que no se pudieron incluir y el motivo
+    skipped: Dict[str, str] = field(default_factory=dict)
+    commands: int = 0
+    ticks: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    errors: int = 0
+    by_kind: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    planning_ms: float | None = None
+    completion_ms: float | None = None
+    error: str | None = None
+
+    def count(self, kind: str, outcome: str):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        counts = self.by_kind.setdefault(kind, {"succeeded": 0, "failed": 0, "errors": 0})
+        counts[outcome] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+async def _spawn_commands(action: WaveAction, positions: Dict[str, Dict], name_tag: str) -> Dict[str, List[str]]:
+    """Calcula los puntos de spawn de todos los jugadores a la vez y recorta los que superen el límite de mobs."""
+    players = list(positions)
+    points_per_player = await asyncio.gather(*(
+        find_spawn_points(positions[player], player_data[player].get("rotation", 0), action.quantity,
+                          spacing=action.spacing, check_terrain=action.check_terrain)
+        for player in players
+    ))
+    if action.mob_type not in transient_mob_types:
+        allowed = await reserve_entities({player: len(points) for player, points in zip(players, points_per_player)})
+        points_per_player = [points[:allowed[player]] for player, points in zip(players, points_per_player)]
+    return {
+        player: [f"summon {action.mob_type}{name_tag} {x} {y} {z}" for x, y, z in points]
+        for player, points in zip(players, points_per_player)
+    }
+
+def _teleport_command(action: WaveAction, player: str, position: Dict) -> str:
+    # Con cientos de jugadores no se hace la búsqueda de /teleport_player: el servidor elige el bloque seguro
+    x = position["x"] + random.randint(-action.range, action.range)
+    z = position["z"] + random.randint(-action.range, action.range)
+    return spread_command(player, x, z)
+
+async def plan_wave(request: WaveRequest, report: WaveReport) -> List[WaveCommand]:
+    """
+    Calcula de antemano todos los comandos de la oleada, jugador por jugador.
+    Se intercalan por jugador para que todos reciban sus primeros comandos en los primeros ticks.
+    """
+    await refresh_player_positions()
+    requested = request.players if request.players is not None else online_players()
+    positions: Dict[str, Dict] = {}
+    for player in requested:
+        position = player_data.get(player, {}).get("position")
+        if player not in player_data or player_data[player].get("offline"):
+            report.skipped[player] = "no conectado"
+        elif not position:
+            report.skipped[player] = "sin posición"
+        else:
+            positions[player] = position
+    report.players = list(positions)
+    if not positions:
+        return []
+
+    color = random.choice(title_colors)
+    name_tag = f' "{color}{request.username}"' if request.username else ""
+    by_player: Dict[str, List[WaveCommand]] = {player: [] for player in positions}
+    for player in positions:
+        author = f" §cde {color}{request.username}" if request.username else ""
+        by_player[player].append(WaveCommand(player, "announce", f'title "{player}" actionbar "§c¡{request.name}{author}§c!"'))
+
+    for action in request.actions:
+        if action.kind == "spawn":
+            for player, commands in (await _spawn_commands(action, positions, name_tag)).items():
+                by_player[player].extend(WaveCommand(player, "spawn", command) for command in commands)
+        elif action.kind == "effect":
+            for player in positions:
+                command = f'effect "{player}" {action.effect} {action.duration} {action.amplifier} true'
+                by_player[player].append(WaveCommand(player, "effect", command))
+        else:
+            for player, position in positions.items():
+                by_player[player].append(WaveCommand(player, "teleport", _teleport_command(action, player, position)))
+
+    interleaved = itertools.chain.from_iterable(itertools.zip_longest(*by_player.values()))
+    return [command for command in interleaved if command is not None]
+
+class WaveScheduler:
+    """
+    Oleadas de caos para todos los jugadores: se planifican de una vez, se envían en lotes
+    de `commands_per_tick` comandos por tick sin esperar a las respuestas de los anteriores
+    y se informa de cuánto tardó la oleada completa.
+    """
+
+    def __init__(self, history: int = wave_history):
+        self.history = history
+        self._reports: "OrderedDict[str, WaveReport]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, request: WaveRequest) -> Tuple[WaveReport, asyncio.Task]:
+        report = WaveReport(id=uuid.uuid4().hex[:12], name=request.name, starts_at=time.time() + request.delay)
+        self._reports[report.id] = report
+        while len(self._reports) > self.history:
+            old_id, _ = self._reports.popitem(last=False)
+            self._tasks.pop(old_id, None)
+        # La oleada pertenece a la redención que la programa, aunque sus comandos salgan después
+        task = background_task(self._run(report, request), capture_redemption())
+        self._tasks[report.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(report.id, None))
+        return report, task
+
+    def get(self, wave_id: str) -> WaveReport | None:
+        return self._reports.get(wave_id)
+
+    def recent(self) -> List[WaveReport]:
+        return list(reversed(self._reports.values()))
+
+    def cancel(self, wave_id: str) -> bool:
+        task = self._tasks.get(wave_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def _run(self, report: WaveReport, request: WaveRequest):
+        try:
+            if request.delay > 0:
+                await asyncio.sleep(request.delay)
+            report.status = "running"
+            with tracer.span("wave", root=True, **{"wave.id": report.id, "wave.name": report.name}) as span:
+                start = time.monotonic()
+                with tracer.span("wave.plan"):
+                    commands = await plan_wave(request, report)
+                report.planning_ms = round((time.monotonic() - start) * 1000, 3)
+                report.commands = len(commands)
+                span.set("wave.players", len(report.players))
+                span.set("wave.commands", len(commands))
+
+                start = time.monotonic()
+                with tracer.span("wave.send"):
+                    await self._send_all(report, commands, request.commands_per_tick or wave_commands_per_tick)
+                report.completion_ms = round((time.monotonic() - start) * 1000, 3)
+                span.set("wave.completion_ms", report.completion_ms)
+            report.status = "done"
+            print(f"Oleada '{report.name}' completada: {report.commands} comandos para {len(report.players)} jugadores "
+                  f"en {report.completion_ms} ms ({report.ticks} ticks, {report.failed + report.errors} fallidos)")
+        except asyncio.CancelledError:
+            report.status = "cancelled"
+            raise
+        except HTTPException as e:
+            report.status = "failed"
+            report.error = e.detail
+        except Exception as e:
+            report.status = "failed"
+            report.error = str(e)
+            print(f"Error en la oleada '{report.name}': {e}")
+
+    async def _send_all(self, report: WaveReport, commands: List[WaveCommand], per_tick: int):
+        # Cada clase del gobernador admite como mucho la mitad de su cola en comandos de la oleada:
+        # así la oleada no llena la cola (429) y las redenciones normales siguen teniendo sitio
+        slots: Dict[str | None, asyncio.Semaphore] = {}
+
+        def slot_for(command: str) -> asyncio.Semaphore:
+            lane = command_governor.classify(command)
+            key = lane.name if lane is not None else None
+            if key not in slots:
+                slots[key] = asyncio.Semaphore(max(1, lane.max_queue // 2) if lane is not None else wave_max_in_flight)
+            return slots[key]
+
+        async def send(command: WaveCommand, slot: asyncio.Semaphore):
+            try:
+                response = await send_minecraft_command(command.command)
+                report.count(command.kind, "succeeded" if response is not None and response.status == 0 else "failed")
+            except HTTPException:
+                report.count(command.kind, "errors")
+            finally:
+                slot.release()
+
+        tasks: List[asyncio.Task] = []
+        try:
+            for index in range(0, len(commands), per_tick):
+                tick_start = time.monotonic()
+                for command in commands[index:index + per_tick]:
+                    slot = slot_for(command.command)
+                    await slot.acquire()
+                    tasks.append(asyncio.create_task(send(command, slot)))
+                report.ticks += 1
+                if index + per_tick < len(commands):
+                    await asyncio.sleep(max(0.0, wave_tick_seconds - (time.monotonic() - tick_start)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+wave_scheduler = WaveScheduler()
@@ -1,13 +1,63 @@
 # main.py
+import time
+
+# Momento en que empieza a importarse la aplicación, para medir el arranque
+_import_start = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from api import websocket
 from api import routes
 from core.state import active_connections, command_requests, player_data, game_event_handlers
+from core.snapshots import snapshot_store, snapshot_loop
+from core.commands import set_command_forwarder
+from core.ipc import bridge_server, bridge_client
+from core.event_log import EventLogMiddleware, event_log
+from core.tracing import TracingMiddleware, tracer
+from core.admission import AdmissionMiddleware
+from config.const import ipc_role
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"Aplicación importada en {_import_ready - _import_start:.3f} s")
+    if ipc_role == "worker":
+        # Los workers no guardan estado propio: reenvían comandos y copian el estado del puente
+        set_command_forwarder(bridge_client.send_command)
+        sync_task = asyncio.create_task(bridge_client.sync_loop())
+        yield
+        sync_task.cancel()
+        await bridge_client.close()
+        await event_log.flush()
+        await tracer.flush()
+        return
 
-app = FastAPI()
+    # Restaura el estado guardado antes de aceptar conexiones
+    restored = await snapshot_store.restore()
+    print(f"Jugadores restaurados de la instantánea: {restored}")
+    snapshot_task = asyncio.create_task(snapshot_loop())
+    if ipc_role == "bridge":
+        await bridge_server.start()
+    yield
+    if ipc_role == "bridge":
+        await bridge_server.stop()
+    # Se espera a que termine la instantánea en curso para no escribir a la vez en la misma conexión
+    snapshot_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await snapshot_task
+    await snapshot_store.save()
+    snapshot_store.close()
+    await event_log.flush()
+    await tracer.flush()
 
+app = FastAPI(lifespan=lifespan)
+
+# Se añade primero para que sea el más interno: las peticiones rechazadas también llevan
+# las cabeceras CORS y quedan en la traza y en el registro de eventos con su 429/503
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -16,6 +66,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(EventLogMiddleware)
+# Se añade después para que sea el más externo y la traza cubra también el registro de eventos
+app.add_middleware(TracingMiddleware)
+
 # Incluir las rutas de la API y los endpoints de WebSocket
 app.include_router(routes.router)
-app.add_api_websocket_route("/ws", websocket.websocket_endpoint)
\ No newline at end of file
+app.add_api_websocket_route("/ws", websocket.websocket_endpoint)
+
+_import_ready = time.perf_counter()
\ No newline at end of file
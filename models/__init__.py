@@ -1,11 +1,17 @@
-from .item_request import ItemRequest
+from .item_request import ItemRequest, ItemBatchRequest
 from .mob_request import MobRequest 
 from .teleport_request import TeleportRequest
 from .roulette_option import RouletteOption
+from .roulette_request import RouletteRequest
+from .wave_request import WaveAction, WaveRequest
 
 __all__ = [
     "ItemRequest", 
+    "ItemBatchRequest",
     "MobRequest", 
     "TeleportRequest",
     "RouletteOption",
+    "RouletteRequest",
+    "WaveAction",
+    "WaveRequest",
 ]
\ No newline at end of file
@@ -1,7 +1,12 @@
-from pydantic import BaseModel
+from typing import List, Literal
+from pydantic import BaseModel, Field
 
 
 class ItemRequest(BaseModel):
     player_name: str
     item_id: str
-    amount: int
\ No newline at end of file
+    amount: int = Field(default=1, ge=1)
+
+class ItemBatchRequest(BaseModel):
+    action: Literal["give", "take"] = "give"
+    items: List[ItemRequest] = Field(min_length=1)
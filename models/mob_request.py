@@ -1,6 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from config.const import max_live_entities_per_player
 
 class MobRequest(BaseModel):
     mob_type: str
-    quantity: int = 1
-    r: int = 0
\ No newline at end of file
+    # Más mobs de los que admite el límite de entidades vivas se recortarían igualmente, después de
+    # haber comprobado el terreno de todos ellos
+    quantity: int = Field(default=1, ge=1, le=max_live_entities_per_player)
+    r: int = 0
+    check_terrain: bool = False
@@ -1,8 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class RouletteOption(BaseModel):
     name: str
     command: str
     duration: int | None = None
     color: str
-    is_bad: bool
\ No newline at end of file
+    is_bad: bool = False
+    weight: float = Field(default=1.0, ge=0)
@@ -1,7 +1,6 @@
 from typing import List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from models.roulette_option import RouletteOption
 
 class RouletteRequest(BaseModel):
-    options: List[RouletteOption]
-    
\ No newline at end of file
+    options: List[RouletteOption] = Field(min_length=1)
@@ -0,0 +1,37 @@
+from typing import List, Literal
+from pydantic import BaseModel, Field, model_validator
+
+from config.const import mob_type_name, effects, max_live_entities_per_player, wave_max_actions, wave_max_delay
+
+class WaveAction(BaseModel):
+    kind: Literal["spawn", "effect", "teleport"]
+    # spawn
+    mob_type: str | None = None
+    # Más mobs por jugador de los que admite el límite de entidades vivas se recortarían igualmente
+    quantity: int = Field(default=1, ge=1, le=max_live_entities_per_player)
+    spacing: int = 1
+    check_terrain: bool = False
+    # effect
+    effect: str | None = None
+    duration: int = Field(default=30, ge=1)
+    amplifier: int = Field(default=0, ge=0, le=255)
+    # teleport: distancia máxima, en cada eje, desde la posición actual del jugador
+    range: int = Field(default=1000, ge=1)
+
+    @model_validator(mode="after")
+    def check_kind(self) -> "WaveAction":
+        if self.kind == "spawn" and self.mob_type not in mob_type_name:
+            raise ValueError(f"Mob desconocido: {self.mob_type}")
+        if self.kind == "effect" and self.effect not in effects:
+            raise ValueError(f"Efecto desconocido: {self.effect}")
+        return self
+
+class WaveRequest(BaseModel):
+    name: str = "Oleada"
+    actions: List[WaveAction] = Field(min_length=1, max_length=wave_max_actions)
+    # Sin lista, la oleada alcanza a todos los jugadores conectados
+    players: List[str] | None = None
+    # Segundos hasta que empieza la oleada
+    delay: float = Field(default=0, ge=0, le=wave_max_delay)
+    commands_per_tick: int | None = Field(default=None, ge=1)
+    username: str | None = None
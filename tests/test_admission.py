@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from core.admission import AdmissionController
+from core.state import command_requests
+
+ROUTES = {
+    "/teleport_player": {"cost": 25, "degraded_cost": 3},
+    "/items/batch": {"cost": 10},
+}
+
+def _controller(**overrides):
+    params = dict(max_in_flight=3, max_backlog=100, degrade_backlog=40, routes=ROUTES, default_cost=2, exempt=["/roulettes/reload"])
+    params.update(overrides)
+    return AdmissionController(**params)
+
+def test_admits_when_idle():
+    controller = _controller()
+    assert controller.decide("/teleport_player") == (200, False)
+    assert controller.decide("/unknown") == (200, False)
+
+def test_rejects_with_429_over_in_flight_limit():
+    controller = _controller()
+    for _ in range(3):
+        controller.start("/items/batch", False)
+    assert controller.decide("/items/batch") == (429, False)
+    # Las rutas exentas entran siempre
+    assert controller.decide("/roulettes/reload") == (200, False)
+
+def test_degrades_only_degradable_routes_over_threshold():
+    controller = _controller(max_in_flight=100)
+    for _ in range(4):
+        controller.start("/items/batch", False)
+    assert controller.backlog() == 40
+    assert controller.decide("/teleport_player") == (200, True)
+    assert controller.decide("/items/batch") == (200, False)
+
+def test_rejects_with_503_when_backlog_would_overflow():
+    controller = _controller(max_in_flight=100)
+    for _ in range(9):
+        controller.start("/items/batch", False)
+    # 90 pendientes + 10 caben justo; una ruta degradada de 3 también
+    assert controller.decide("/items/batch") == (200, False)
+    controller.start("/items/batch", False)
+    assert controller.decide("/items/batch") == (503, False)
+    assert controller.decide("/teleport_player") == (503, False)
+
+def test_finish_releases_cost():
+    controller = _controller()
+    cost = controller.start("/teleport_player", True)
+    assert cost == 3
+    assert controller.in_flight == 1 and controller.in_flight_cost == 3
+    controller.finish(cost)
+    assert controller.in_flight == 0 and controller.in_flight_cost == 0
+
+def test_backlog_counts_commands_waiting_for_a_response():
+    controller = _controller()
+    command_requests.update({f"pending-{i}": None for i in range(7)})
+    try:
+        assert controller.backlog() == 7
+    finally:
+        for i in range(7):
+            command_requests.pop(f"pending-{i}")
+
+@pytest.mark.parametrize("excess, expected", [(0, 1), (20, 1), (21, 2), (200, 10), (10_000, 60)])
+def test_retry_after_uses_default_drain_rate(excess, expected):
+    # Sin peticiones terminadas se supone el ritmo por defecto (20 comandos/s)
+    assert _controller().retry_after(excess) == expected
+
+def test_rejection_response_and_counters():
+    controller = _controller()
+    for _ in range(3):
+        controller.start("/items/batch", False)
+    response = controller.reject("/items/batch", 429)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    stats = controller.stats()
+    assert stats["shed"] == {"/items/batch": {"429": 1}}
+    assert stats["shed_total"] == 1
+
+def test_backlog_counts_scheduled_animation_frames(monkeypatch):
+    from fastapi import HTTPException
+    from core import admission
+    from utils.animation import AnimationScheduler, Frame
+
+    async def scenario():
+        scheduler = AnimationScheduler(max_pending=1)
+        monkeypatch.setattr(admission, "animation_scheduler", scheduler)
+        frames = [Frame(at, ["title Steve title x", "playsound random.click Steve"]) for at in (10.0, 11.0)]
+        scheduler.play("Steve", frames)
+        # La segunda del mismo jugador espera turno; con la cola de espera llena se rechaza la tercera
+        scheduler.play("Steve", frames)
+        backlog = _controller().backlog()
+        with pytest.raises(HTTPException) as excinfo:
+            scheduler.play("Steve", frames)
+        scheduler._task.cancel()
+        return backlog, excinfo.value.status_code
+
+    backlog, status_code = asyncio.run(scenario())
+    assert backlog == 8
+    assert status_code == 503
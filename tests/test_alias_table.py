@@ -0,0 +1,41 @@
+import random
+from collections import Counter
+
+import pytest
+
+from utils.alias_table import AliasTable
+
+def test_draw_matches_weights():
+    table = AliasTable(["a", "b", "c"], [1, 2, 7])
+    rng = random.Random(1)
+    draws = 100_000
+    counts = Counter(table.draw(rng) for _ in range(draws))
+    assert counts["a"] / draws == pytest.approx(0.1, abs=0.01)
+    assert counts["b"] / draws == pytest.approx(0.2, abs=0.01)
+    assert counts["c"] / draws == pytest.approx(0.7, abs=0.01)
+
+def test_zero_weight_is_never_drawn():
+    table = AliasTable(["never", "always"], [0, 3])
+    rng = random.Random(2)
+    assert {table.draw(rng) for _ in range(1000)} == {"always"}
+
+def test_single_item():
+    table = AliasTable(["only"], [0.5])
+    assert len(table) == 1
+    assert table.draw(random.Random(3)) == "only"
+
+def test_same_seed_same_draws():
+    table = AliasTable(list(range(10)), [i + 1 for i in range(10)])
+    first = [table.draw(random.Random(4)) for _ in range(5)]
+    second = [table.draw(random.Random(4)) for _ in range(5)]
+    assert first == second
+
+@pytest.mark.parametrize("items, weights", [
+    ([], []),
+    (["a", "b"], [1]),
+    (["a"], [-1]),
+    (["a", "b"], [0, 0]),
+])
+def test_invalid_tables_are_rejected(items, weights):
+    with pytest.raises(ValueError):
+        AliasTable(items, weights)
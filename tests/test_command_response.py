@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from core.commands import DetailedCommandResponse
+
+def _raw(status, message="", **body):
+    return json.dumps({
+        "header": {"messagePurpose": "commandResponse", "requestId": "abc"},
+        "body": {"statusCode": status, "statusMessage": message, **body},
+    })
+
+def test_from_raw_reads_status_without_decoding_body():
+    response = DetailedCommandResponse.from_raw(_raw(0, "Hecho"))
+    assert response.status == 0
+    assert response.ok
+    assert repr(response) == "DetailedCommandResponse(status=0)"
+
+def test_body_is_decoded_on_demand():
+    response = DetailedCommandResponse.from_raw(_raw(0, "Hay 2/10 jugadores", players="Steve, Alex", details="[]"))
+    assert response.message == "Hay 2/10 jugadores"
+    assert response.details == "[]"
+    assert response.body["players"] == "Steve, Alex"
+    assert "message='Hay 2/10 jugadores'" in repr(response)
+
+def test_negative_status_codes():
+    # Bedrock devuelve los errores como enteros negativos de 32 bits
+    response = DetailedCommandResponse.from_raw(_raw(-2147483648, "Sintaxis incorrecta"))
+    assert response.status == -2147483648
+    assert not response.ok
+    assert response.message == "Sintaxis incorrecta"
+
+def test_compact_json_uses_status_only_path():
+    raw = json.dumps({"body": {"statusMessage": "Hecho", "statusCode": 0}}, separators=(",", ":"))
+    response = DetailedCommandResponse.from_raw(raw)
+    assert response.status == 0
+    assert repr(response) == "DetailedCommandResponse(status=0)"
+    assert response.message == "Hecho"
+
+def test_falls_back_to_full_parse_without_status_code():
+    # Sin código de estado se decodifica el mensaje completo, que falla igual que `parse`
+    with pytest.raises(KeyError):
+        DetailedCommandResponse.from_raw(json.dumps({"body": {"statusMessage": "Hecho"}}))
+
+def test_equality_matches_parse_and_constructor():
+    raw = _raw(1, "Sin objetivos", details="x")
+    lazy = DetailedCommandResponse.from_raw(raw)
+    parsed = DetailedCommandResponse.parse(json.loads(raw))
+    built = DetailedCommandResponse(message="Sin objetivos", status=1, details="x")
+    assert lazy == parsed == built
+    assert lazy != DetailedCommandResponse(message="Sin objetivos", status=0, details="x")
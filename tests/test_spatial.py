@@ -0,0 +1,74 @@
+import math
+import random
+
+import pytest
+
+from core.spatial import PlayerGrid
+
+def _position(x, y, z):
+    return {"x": x, "y": y, "z": z}
+
+def _random_grid(seed, players=200, spread=500, cell_size=16):
+    rng = random.Random(seed)
+    grid = PlayerGrid(cell_size)
+    positions = {}
+    for i in range(players):
+        point = (rng.uniform(-spread, spread), rng.uniform(-60, 200), rng.uniform(-spread, spread))
+        positions[f"p{i}"] = point
+        grid.update(f"p{i}", _position(*point))
+    return grid, positions
+
+def _distance(a, b):
+    return math.dist(a, b)
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_within_matches_brute_force(seed):
+    grid, positions = _random_grid(seed)
+    rng = random.Random(seed + 100)
+    for _ in range(50):
+        center = (rng.uniform(-500, 500), rng.uniform(-60, 200), rng.uniform(-500, 500))
+        radius = rng.choice([5, 30, 120, 2000])
+        expected = sorted((name for name, point in positions.items() if _distance(point, center) <= radius),
+                          key=lambda name: _distance(positions[name], center))
+        assert grid.within(*center, radius) == expected
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_nearest_matches_brute_force(seed):
+    grid, positions = _random_grid(seed)
+    rng = random.Random(seed + 200)
+    for _ in range(50):
+        center = (rng.uniform(-600, 600), rng.uniform(-60, 200), rng.uniform(-600, 600))
+        k = rng.choice([1, 3, 10])
+        expected = sorted(positions, key=lambda name: _distance(positions[name], center))[:k]
+        assert grid.nearest(*center, k=k) == expected
+
+def test_nearest_excludes_and_caps_k():
+    grid = PlayerGrid()
+    grid.update("a", _position(0, 64, 0))
+    grid.update("b", _position(100, 64, 0))
+    assert grid.nearest(0, 64, 0, k=5, exclude={"a"}) == ["b"]
+    assert grid.nearest(0, 64, 0, k=1, exclude={"a", "b"}) == []
+
+def test_nearest_across_cell_border():
+    # El vecino de la celda contigua está más cerca que uno de la misma celda
+    grid = PlayerGrid(16)
+    grid.update("same_cell", _position(1, 64, 1))
+    grid.update("next_cell", _position(16.5, 64, 15))
+    assert grid.nearest(15.9, 64, 15, k=1) == ["next_cell"]
+
+def test_moving_and_removing_players():
+    grid = PlayerGrid()
+    grid.update("a", _position(0, 64, 0))
+    grid.update("a", _position(1000, 64, 1000))
+    assert grid.within(0, 64, 0, 50) == []
+    assert grid.within(1000, 64, 1000, 1) == ["a"]
+
+    grid.update("a", None)
+    assert grid.position("a") is None
+    assert grid.within(1000, 64, 1000, 1) == []
+
+def test_rebuild_skips_players_without_position():
+    grid = PlayerGrid()
+    grid.rebuild({"a": {"position": _position(0, 64, 0)}, "b": {"position": None}})
+    assert grid.position("a") == (0, 64, 0)
+    assert grid.position("b") is None
@@ -0,0 +1,70 @@
+import asyncio
+import random
+
+import pytest
+
+from utils.synthetic_terrain import SyntheticWorld
+from utils.teleport_search import MAX_ITERATIONS, CountingBlockQuery, find_safe_y, is_safe_location
+
+COLUMNS = [(x, z) for x in range(-3000, 3001, 1500) for z in (-2200, 0, 1700)]
+
+@pytest.fixture(scope="module")
+def world():
+    return SyntheticWorld(seed=7)
+
+def _search(world, x, z, seed=0, on_probe=None):
+    return asyncio.run(find_safe_y(world, x, z, rng=random.Random(seed), on_probe=on_probe))
+
+@pytest.mark.parametrize("x, z", COLUMNS)
+def test_found_height_is_safe(world, x, z):
+    result = _search(world, x, z)
+    assert 1 <= result.iterations <= MAX_ITERATIONS
+    if result.y is not None:
+        safe, reason = asyncio.run(is_safe_location(world, result.x, result.y, result.z))
+        assert safe, reason
+        assert world.landing(result.x, result.y, result.z) in ("solid", "water")
+
+def test_probes_match_block_queries(world):
+    counter = CountingBlockQuery(world)
+    probes = []
+    result = asyncio.run(find_safe_y(counter, 120, -340, rng=random.Random(1), on_probe=lambda *args: probes.append(args)))
+    assert result.probes == counter.probes
+    # Cada iteración hace entre 1 y 3 + len(DANGEROUS_BLOCKS) consultas
+    assert result.iterations <= result.probes
+    assert len(probes) == result.iterations
+    assert [probe[0] for probe in probes] == list(range(1, result.iterations + 1))
+
+def test_search_is_deterministic_with_seeded_rng(world):
+    first = [_search(world, x, z, seed=42) for x, z in COLUMNS]
+    second = [_search(world, x, z, seed=42) for x, z in COLUMNS]
+    assert first == second
+
+class FlatWorld:
+    """Suelo plano de `floor` hasta `ground` y aire encima."""
+
+    def __init__(self, ground, floor="stone"):
+        self.ground = ground
+        self.floor = floor
+
+    async def is_block(self, x, y, z, block):
+        if y > self.ground:
+            return block == "air"
+        return block == (self.floor if y == self.ground else "stone")
+
+@pytest.mark.parametrize("ground", [-40, 0, 40, 63])
+def test_finds_surface_of_flat_ground(ground):
+    result = asyncio.run(find_safe_y(FlatWorld(ground), 10, 20, rng=random.Random(0)))
+    assert result.y == ground + 1
+    assert (result.x, result.z) == (10, 20)
+
+def test_stops_at_iteration_limit():
+    # Suelo sólido sobre el nivel del mar: la búsqueda no converge y se corta en el límite
+    result = asyncio.run(find_safe_y(FlatWorld(100), 0, 0, rng=random.Random(0)))
+    assert result.y is None
+    assert result.iterations == MAX_ITERATIONS
+
+def test_never_lands_on_lava():
+    result = asyncio.run(find_safe_y(FlatWorld(30, floor="lava"), 0, 0, rng=random.Random(3)))
+    assert result.y is None
+    # Cada bloque peligroso desplaza la columna
+    assert (result.x, result.z) != (0, 0)
@@ -0,0 +1,74 @@
+import asyncio
+import math
+
+import pytest
+from fastapi import HTTPException
+
+import utils.token_bucket as token_bucket
+from core.governor import CommandGovernor, CommandLane
+from utils.token_bucket import TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(token_bucket.time, "monotonic", fake)
+    return fake
+
+def test_starts_full_and_drains(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+
+def test_refills_at_rate_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.take()
+    clock.now += 0.5
+    assert bucket.take()
+    assert not bucket.take()
+    clock.now += 100
+    assert bucket.is_full()
+    assert bucket.tokens == 3
+
+def test_wait_time(clock):
+    bucket = TokenBucket(rate=4, capacity=1)
+    assert bucket.wait_time() == 0.0
+    bucket.take()
+    assert bucket.wait_time() == pytest.approx(0.25)
+    clock.now += 0.1
+    assert bucket.wait_time() == pytest.approx(0.15)
+
+def test_wait_time_without_refill_is_infinite(clock):
+    bucket = TokenBucket(rate=0, capacity=1)
+    bucket.take()
+    assert bucket.wait_time() == math.inf
+
+def test_lane_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        CommandLane("broken", rate=0, burst=1)
+
+def test_governor_classifies_execute_run():
+    governor = CommandGovernor({"summon": {"commands": ["summon"], "rate": 1, "burst": 1}})
+    assert governor.classify("/summon zombie").name == "summon"
+    assert governor.classify("execute as @a at @s run summon zombie ~ ~ ~").name == "summon"
+    assert governor.classify("say hola") is None
+
+def test_reject_policy_returns_429_with_retry_after():
+    lane = CommandLane("tp", rate=1, burst=1, policy="reject")
+
+    async def run():
+        await lane.acquire()
+        with pytest.raises(HTTPException) as error:
+            await lane.acquire()
+        return error.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert lane.sent == 1 and lane.rejected == 1
@@ -0,0 +1,49 @@
+# utils/alias_table.py
+import random
+from typing import Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+class AliasTable(Generic[T]):
+    """
+    Tabla de alias (método de Vose) para elegir elementos con pesos en O(1).
+    La construcción es O(n) y se hace una sola vez por lista de opciones.
+    """
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if not items or len(items) != len(weights):
+            raise ValueError("Se necesita al menos un elemento y un peso por elemento.")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Los pesos no pueden ser negativos.")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("La suma de los pesos debe ser positiva.")
+
+        n = len(items)
+        self.items: List[T] = list(items)
+        self._prob: List[float] = [0.0] * n
+        self._alias: List[int] = [0] * n
+
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Lo que queda tiene probabilidad 1 (salvo errores de redondeo)
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def draw(self, rng: random.Random | None = None) -> T:
+        rng = rng or random
+        i = rng.randrange(len(self.items))
+        return self.items[i] if rng.random() < self._prob[i] else self.items[self._alias[i]]
@@ -0,0 +1,232 @@
+# utils/animation.py
+import asyncio
+import heapq
+import itertools
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from fastapi import HTTPException
+from core.commands import send_minecraft_command
+from core.event_log import RedemptionScope, background_task, capture_redemption, redemption_scope
+from config.const import animation_max_pending
+
+# Curva de la ruleta: giro rápido y después pausas crecientes hasta detenerse
+SPIN_FRAMES = 30
+SPIN_INTERVAL = 0.1
+SLOWDOWN_DELAYS = [0.2, 0.4, 0.6, 0.8, 1.0]
+REVEAL_DELAY = 1.0
+RESULT_DELAY = 2.0
+
+@dataclass
+class Frame:
+    """Un fotograma de la animación: comandos que se envían `at` segundos después del inicio."""
+    at: float
+    commands: List[str]
+    # Si el cliente va atrasado, los fotogramas descartables se pueden saltar
+    skippable: bool = True
+
+@dataclass
+class Animation:
+    target: str
+    frames: List[Frame]
+    future: asyncio.Future
+    start_delay: float = 0.0
+    # Redención que pidió la animación: sus comandos se le asocian aunque los envíe el planificador
+    redemption: RedemptionScope = (None, None)
+    started_at: float = 0.0
+    cursor: int = 0
+    skipped: int = 0
+    # Comandos que faltan por enviar (o saltar), para el control de admisión
+    remaining: int = 0
+    seq: int = field(default_factory=itertools.count().__next__)
+
+    def due(self) -> float:
+        return self.started_at + self.frames[self.cursor].at
+
+def _conflicts(target: str, other: str) -> bool:
+    """Dos animaciones chocan si apuntan al mismo jugador o alguna usa un selector (@a, @a[r=...])."""
+    return target == other or target.startswith("@") or other.startswith("@")
+
+class AnimationScheduler:
+    """
+    Reproduce animaciones precalculadas con un único reloj compartido.
+    Las animaciones de jugadores distintos avanzan a la vez; las del mismo jugador esperan su turno
+    para que sus títulos no se mezclen.
+    """
+
+    def __init__(self, max_lag: float = 0.25, max_pending: int = animation_max_pending):
+        self.max_lag = max_lag
+        self.max_pending = max_pending
+        self._heap: List[Tuple[float, int, Animation]] = []
+        self._active: List[Animation] = []
+        self._pending: List[Animation] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+    def play(self, target: str, frames: List[Frame], start_delay: float = 0.0) -> asyncio.Future:
+        """
+        Programa una animación y devuelve un futuro que se completa al enviarse el último fotograma.
+        Si ya hay `max_pending` animaciones esperando turno, se rechaza con 503.
+        """
+        if len(self._pending) >= self.max_pending:
+            raise HTTPException(status_code=503, detail="Hay demasiadas animaciones en cola. Inténtalo más tarde.")
+        loop = asyncio.get_running_loop()
+        animation = Animation(target=target, frames=sorted(frames, key=lambda f: f.at), future=loop.create_future(), start_delay=start_delay, redemption=capture_redemption())
+        if not animation.frames:
+            animation.future.set_result(0)
+            return animation.future
+
+        animation.remaining = sum(len(frame.commands) for frame in animation.frames)
+        self._pending.append(animation)
+        self._start_pending()
+        self._ensure_running()
+        return animation.future
+
+    def queued_commands(self) -> int:
+        """Comandos de las animaciones en curso y en espera que aún no se han enviado."""
+        return sum(animation.remaining for animation in self._active) + sum(animation.remaining for animation in self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": len(self._active),
+            "pending": len(self._pending),
+            "queued_commands": self.queued_commands(),
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+        }
+
+    def _start_pending(self):
+        now = asyncio.get_running_loop().time()
+        for animation in list(self._pending):
+            busy = self._active + [a for a in self._pending if a.seq < animation.seq]
+            if any(_conflicts(animation.target, other.target) for other in busy if other is not animation):
+                continue
+            self._pending.remove(animation)
+            self._active.append(animation)
+            animation.started_at = now + animation.start_delay
+            heapq.heappush(self._heap, (animation.due(), animation.seq, animation))
+        self._wakeup.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            # El reloj es compartido: no debe heredar la redención de la petición que lo arranca
+            self._task = background_task(self._run())
+
+    def _finish(self, animation: Animation, error: Exception | None = None):
+        self._active.remove(animation)
+        if not animation.future.done():
+            if error is not None:
+                animation.future.set_exception(error)
+            else:
+                animation.future.set_result(animation.skipped)
+        self._start_pending()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._heap or self._pending:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, _ = self._heap[0]
+            delay = due - loop.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = loop.time()
+            ready: List[Animation] = []
+            while self._heap and self._heap[0][0] <= now:
+                ready.append(heapq.heappop(self._heap)[2])
+
+            await asyncio.gather(*(self._advance(animation, now) for animation in ready))
+
+    async def _advance(self, animation: Animation, now: float):
+        """Envía los fotogramas vencidos de una animación, saltando los que llegan demasiado tarde."""
+        due_frames: List[Frame] = []
+        while animation.cursor < len(animation.frames) and animation.due() <= now:
+            due_frames.append(animation.frames[animation.cursor])
+            animation.cursor += 1
+
+        to_send: List[Frame] = []
+        for i, frame in enumerate(due_frames):
+            animation.remaining -= len(frame.commands)
+            is_last = i == len(due_frames) - 1
+            late = now - (animation.started_at + frame.at) > self.max_lag
+            if frame.skippable and not is_last and late:
+                animation.skipped += 1
+                self.frames_skipped += 1
+                continue
+            to_send.append(frame)
+
+        try:
+            with redemption_scope(animation.redemption):
+                for frame in to_send:
+                    for command in frame.commands:
+                        await send_minecraft_command(command, wait=False)
+                    self.frames_sent += 1
+        except HTTPException as e:
+            print(f"Animación para {animation.target} interrumpida: {e.detail}")
+            self._finish(animation, e)
+            return
+        except Exception as e:
+            # Un error inesperado no puede dejar la animación activa: bloquearía al jugador (y a @a) para siempre
+            print(f"Error en la animación para {animation.target}: {e}")
+            self._finish(animation, e)
+            return
+
+        if animation.cursor < len(animation.frames):
+            heapq.heappush(self._heap, (animation.due(), animation.seq, animation))
+        else:
+            self._finish(animation)
+
+animation_scheduler = AnimationScheduler()
+
+def log_animation_result(future: asyncio.Future):
+    """Callback para las animaciones que nadie espera: recoge su error para que no pase en silencio."""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"La animación terminó con error: {future.exception()}")
+
+def roulette_frames(target: str, spin_titles: List[str], winner_title: str, final_commands: List[str], reveal_commands: List[str] | None = None) -> List[Frame]:
+    """
+    Precalcula la animación completa de una ruleta.
+
+    Args:
+        target (str): Selector o jugador que verá la animación.
+        spin_titles (List[str]): Títulos de los que se eligen los fotogramas del giro.
+        winner_title (str): Título del resultado, también el último del giro.
+        final_commands (List[str]): Comandos que se ejecutan al terminar (p. ej. aplicar el efecto).
+        reveal_commands (List[str] | None): Comandos extra al revelar el resultado (sonidos).
+    """
+    frames: List[Frame] = []
+    at = 0.0
+
+    # Fase 1: Giro rápido
+    for _ in range(SPIN_FRAMES):
+        frames.append(Frame(at, [f'title {target} title {random.choice(spin_titles)}', f'playsound random.click {target}']))
+        at += SPIN_INTERVAL
+
+    # Fase 2: Ralentización, el último fotograma ya muestra al ganador
+    for i, delay in enumerate(SLOWDOWN_DELAYS):
+        is_winner = i == len(SLOWDOWN_DELAYS) - 1
+        title = winner_title if is_winner else random.choice(spin_titles)
+        frames.append(Frame(at, [f'title {target} title {title}', f'playsound random.bowhit {target}'], skippable=not is_winner))
+        at += delay
+
+    # Muestra el título final y un subtítulo
+    frames.append(Frame(at, [f'title {target} title ¡Ha salido!'], skippable=False))
+    at += REVEAL_DELAY
+    frames.append(Frame(at, [f'title {target} title {winner_title}', f'title {target} subtitle ¡Buena suerte!'] + (reveal_commands or []), skippable=False))
+    at += RESULT_DELAY
+
+    # Pausa para que el jugador pueda ver el resultado antes de ejecutar el comando ganador
+    frames.append(Frame(at, final_commands, skippable=False))
+    return frames
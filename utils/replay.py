@@ -0,0 +1,181 @@
+# utils/replay.py
+"""
+Reproduce una sesión capturada con MC_EVENT_LOG contra un cliente de Minecraft simulado.
+
+Uso:
+    python -m utils.replay eventos.ndjson --speed 4
+
+Las redenciones se envían a las rutas en el mismo orden y con los mismos intervalos
+(divididos por --speed). El cliente simulado contesta cada comando con la respuesta y la
+latencia registradas para el comando de la misma redención y con el mismo orden dentro de ella
+(las coordenadas aleatorias cambian de una ejecución a otra, el orden no). Los registros antiguos,
+sin orden, se asocian por el texto del comando; los comandos sin registro responden con éxito.
+Las pausas internas de las rutas (p. ej. la espera del teletransporte) no se aceleran.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Tuple
+from urllib.parse import urlencode
+
+from core.state import active_connections, command_requests, player_data
+from core.commands import DetailedCommandResponse
+from core.event_log import current_redemption, current_command_seq, redemption_scope, start_redemption
+from core.spatial import player_index
+from core.positions import mark_position_fresh
+
+ResponseKey = Tuple[str, int]
+
+def load_log(path: str) -> Tuple[List[Dict[str, Any]], Dict[ResponseKey, Dict[str, Any]], Dict[str, Deque[Dict[str, Any]]]]:
+    """
+    Devuelve las redenciones en orden, las respuestas registradas por (redención, orden del comando)
+    y, para los registros sin orden, agrupadas por comando.
+    """
+    redemptions: List[Dict[str, Any]] = []
+    by_sequence: Dict[ResponseKey, Dict[str, Any]] = {}
+    responses: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["kind"] == "redemption":
+                redemptions.append(record)
+            elif record["kind"] == "response" and "status" in record:
+                if record.get("redemption") is not None and record.get("seq") is not None:
+                    by_sequence[(record["redemption"], record["seq"])] = record
+                else:
+                    responses[record["command"]].append(record)
+    redemptions.sort(key=lambda record: record["t"])
+    return redemptions, by_sequence, responses
+
+class SimulatedClient:
+    """Sustituye al websocket de Minecraft: contesta los comandos con las respuestas registradas."""
+
+    def __init__(self, by_sequence: Dict[ResponseKey, Dict[str, Any]], responses: Dict[str, Deque[Dict[str, Any]]], speed: float):
+        self.by_sequence = by_sequence
+        self.responses = responses
+        self.speed = speed
+        self.commands_sent = 0
+
+    async def send_text(self, data: str):
+        message = json.loads(data)
+        if message["header"]["messagePurpose"] != "commandRequest":
+            return
+        self.commands_sent += 1
+        request_id = message["header"]["requestId"]
+        command = message["body"]["commandLine"]
+        # Se envía desde la tarea del propio comando, así que su redención y su orden están en el contexto
+        record = self.by_sequence.get((current_redemption.get(), current_command_seq.get()))
+        if record is None:
+            recorded = self.responses.get(command)
+            record = recorded.popleft() if recorded else {"status": 0, "message": "", "latency": 0.0}
+            if recorded is not None and not recorded:
+                # Si se acaban las respuestas de un comando se reutiliza la última
+                recorded.append(record)
+        asyncio.get_running_loop().call_later(record.get("latency", 0.0) / self.speed, self._resolve, request_id, record)
+
+    def _resolve(self, request_id: str, record: Dict[str, Any]):
+        future = command_requests.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_result(DetailedCommandResponse(message=record.get("message"), status=record["status"]))
+
+async def call_route(app, path: str, query: Dict[str, str], body: str) -> int:
+    """Ejecuta una petición POST directamente sobre la aplicación ASGI y devuelve el código de estado."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query).encode(),
+        "headers": [(b"content-type", b"application/json"), (b"host", b"replay")],
+        "client": ("replay", 0),
+        "server": ("replay", 80),
+    }
+    status_code = 500
+
+    async def receive():
+        return {"type": "http.request", "body": body.encode(), "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+async def replay(path: str, speed: float) -> Dict[str, Any]:
+    from main import app
+    from core.event_log import event_log
+
+    # La reproducción no debe volver a registrarse en el mismo archivo
+    event_log.path = ""
+    redemptions, by_sequence, responses = load_log(path)
+    if not redemptions:
+        return {"redemptions": 0}
+
+    client = SimulatedClient(by_sequence, responses, speed)
+    active_connections.append(client)
+    results: List[Tuple[str, int, float]] = []
+
+    async def run(record: Dict[str, Any]):
+        # Cada redención ve las posiciones que tenían los jugadores cuando llegó; se marcan como recientes
+        # para no enviar un `querytarget` que no hubo en la sesión original y desplazaría el orden de los comandos
+        for name, state in record.get("players", {}).items():
+            player_data.setdefault(name, {}).update(state)
+            player_index.update(name, state.get("position"))
+            if state.get("position"):
+                mark_position_fresh(name)
+        start = time.monotonic()
+        try:
+            # Con el registro desactivado el middleware no abre redención: se usa la registrada
+            with redemption_scope(start_redemption(record.get("id"))):
+                status_code = await call_route(app, record["path"], record.get("query", {}), record.get("body", ""))
+        except Exception as e:
+            print(f"Error al reproducir {record['path']}: {e}")
+            status_code = 500
+        results.append((record["path"], status_code, time.monotonic() - start))
+
+    first = redemptions[0]["t"]
+    wall_start = time.monotonic()
+    tasks = []
+    for record in redemptions:
+        delay = (record["t"] - first) / speed - (time.monotonic() - wall_start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(run(record)))
+    await asyncio.gather(*tasks)
+    active_connections.remove(client)
+
+    durations = sorted(duration for _, _, duration in results)
+    by_status: Dict[int, int] = defaultdict(int)
+    for _, status_code, _ in results:
+        by_status[status_code] += 1
+    return {
+        "redemptions": len(results),
+        "commands": client.commands_sent,
+        "wall_time": time.monotonic() - wall_start,
+        "status_codes": dict(by_status),
+        "p50": statistics.median(durations),
+        "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        "max": durations[-1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce un registro de redenciones contra un cliente simulado.")
+    parser.add_argument("log", help="Archivo NDJSON generado con MC_EVENT_LOG")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de aceleración (1 = tiempo real)")
+    args = parser.parse_args()
+
+    summary = asyncio.run(replay(args.log, args.speed))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# utils/spawn_placement.py
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from core.queries import test_for_block
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional, sin él se usa la versión en Python puro
+    np = None
+
+Point = Tuple[float, float, float]
+
+# Segundos que se considera válido el resultado de un `testforblock`
+BLOCK_CACHE_TTL = 30.0
+# Bloques que se recuerdan como máximo; se descartan primero los menos usados
+BLOCK_CACHE_SIZE = 4096
+# `testforblock` en vuelo a la vez al validar el terreno
+MAX_CONCURRENT_PROBES = 16
+
+_block_cache: "OrderedDict[Tuple[int, int, int], Tuple[bool, float]]" = OrderedDict()
+_probe_slots = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+
+def _ring_layout(count: int, distance: float, spacing: float, arc: float) -> Tuple[List[float], List[float]]:
+    """
+    Reparte `count` posiciones en arcos concéntricos delante del jugador.
+    Devuelve dos listas paralelas: radio de cada punto y desplazamiento angular respecto a la mirada.
+    """
+    radii: List[float] = []
+    offsets: List[float] = []
+    ring = 0
+    while len(radii) < count:
+        radius = distance + ring * spacing
+        # Cuántos puntos caben en el arco manteniendo la separación mínima
+        slots = max(1, int(arc * radius / spacing) + 1)
+        slots = min(slots, count - len(radii))
+        for i in range(slots):
+            # Se reparten simétricamente alrededor de la dirección de la mirada
+            offset = 0.0 if slots == 1 else -arc / 2 + arc * i / (slots - 1)
+            radii.append(radius)
+            offsets.append(offset)
+        ring += 1
+    return radii, offsets
+
+def compute_spawn_points(position: Dict, yaw: float, quantity: int, distance: float = 3, spacing: float = 1, arc: float = math.radians(120)) -> List[Point]:
+    """
+    Genera `quantity` puntos de spawn sin solaparse, en un arco delante del jugador.
+    Cada punto ocupa un bloque distinto (centro del bloque), por lo que dos mobs nunca
+    se invocan en la misma celda.
+    """
+    if quantity <= 0:
+        return []
+
+    spacing = max(1.0, float(spacing))
+    yaw_in_radians = yaw * (math.pi / 180)
+    # Se generan candidatos de sobra por si al redondear a bloques dos puntos coinciden
+    radii, offsets = _ring_layout(quantity * 2, distance, spacing, arc)
+
+    if np is not None:
+        angles = yaw_in_radians + np.asarray(offsets)
+        r = np.asarray(radii)
+        cells_x = np.floor(position["x"] - np.sin(angles) * r).astype(int)
+        cells_z = np.floor(position["z"] + np.cos(angles) * r).astype(int)
+        cells = list(zip(cells_x.tolist(), cells_z.tolist()))
+    else:
+        cells = [
+            (math.floor(position["x"] - math.sin(yaw_in_radians + offset) * radius),
+             math.floor(position["z"] + math.cos(yaw_in_radians + offset) * radius))
+            for radius, offset in zip(radii, offsets)
+        ]
+
+    points: List[Point] = []
+    seen = set()
+    for cell in cells:
+        if cell in seen:
+            continue
+        seen.add(cell)
+        points.append((cell[0] + 0.5, position["y"], cell[1] + 0.5))
+        if len(points) == quantity:
+            break
+    return points
+
+async def _is_air(x: int, y: int, z: int) -> bool:
+    """Comprueba si un bloque es aire, usando la caché si el resultado es reciente."""
+    key = (x, y, z)
+    cached = _block_cache.get(key)
+    now = time.monotonic()
+    if cached and now - cached[1] < BLOCK_CACHE_TTL:
+        _block_cache.move_to_end(key)
+        return cached[0]
+
+    async with _probe_slots:
+        is_air = await test_for_block(x, y, z, "air")
+    _block_cache[key] = (is_air, time.monotonic())
+    _block_cache.move_to_end(key)
+    while len(_block_cache) > BLOCK_CACHE_SIZE:
+        _block_cache.popitem(last=False)
+    return is_air
+
+async def filter_free_points(points: List[Point]) -> List[Point]:
+    """Descarta los puntos cuyo bloque de los pies o de la cabeza no está libre."""
+    async def is_free(point: Point) -> bool:
+        x, y, z = math.floor(point[0]), math.floor(point[1]), math.floor(point[2])
+        feet, head = await asyncio.gather(_is_air(x, y, z), _is_air(x, y + 1, z))
+        return feet and head
+
+    results = await asyncio.gather(*(is_free(point) for point in points))
+    return [point for point, free in zip(points, results) if free]
+
+async def find_spawn_points(position: Dict, yaw: float, quantity: int, spacing: float = 1, check_terrain: bool = False) -> List[Point]:
+    """
+    Calcula los puntos de spawn y, si se pide, los valida contra el terreno.
+    Al validar se prueban el doble de candidatos para compensar los que caen dentro de paredes.
+    """
+    if not check_terrain:
+        return compute_spawn_points(position, yaw, quantity, spacing=spacing)
+
+    candidates = compute_spawn_points(position, yaw, quantity * 2, spacing=spacing)
+    free_points = await filter_free_points(candidates)
+    return free_points[:quantity]
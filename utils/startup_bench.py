@@ -0,0 +1,66 @@
+# utils/startup_bench.py
+"""
+Mide el tiempo de arranque en frío de la aplicación.
+
+Uso:
+    python -m utils.startup_bench --runs 10 --top 15
+
+Cada ejecución importa `main` en un proceso nuevo con `python -X importtime`, así que
+no se aprovecha la caché de módulos. Se muestra la mediana del tiempo total y los módulos
+más lentos (tiempo acumulado, incluyendo sus dependencias) de la mediana de las ejecuciones.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """Devuelve el tiempo acumulado de importación (µs) de cada módulo."""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # Formato: "import time:   <propio> | <acumulado> | <módulo>" (indentado según la profundidad)
+        _, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        cumulative[module.strip()] = int(cumulative_us)
+    return cumulative
+
+def run_once(module: str) -> Tuple[float, Dict[str, int]]:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+    return elapsed, _parse_importtime(result.stderr)
+
+def benchmark(module: str, runs: int) -> List[Tuple[float, Dict[str, int]]]:
+    return sorted((run_once(module) for _ in range(runs)), key=lambda item: item[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación de la aplicación en procesos nuevos.")
+    parser.add_argument("--module", default="main", help="Módulo a importar (por defecto main)")
+    parser.add_argument("--runs", type=int, default=5, help="Número de arranques a medir")
+    parser.add_argument("--top", type=int, default=15, help="Cuántos módulos lentos mostrar")
+    args = parser.parse_args()
+
+    results = benchmark(args.module, max(1, args.runs))
+    wall_times = [elapsed for elapsed, _ in results]
+    _, median_modules = results[len(results) // 2]
+
+    print(f"Arranques: {len(results)}")
+    print(f"Mediana: {statistics.median(wall_times):.3f} s  (mín {wall_times[0]:.3f} s, máx {wall_times[-1]:.3f} s)")
+    print("Módulos más lentos (acumulado, µs):")
+    slowest = sorted(median_modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for module, cumulative_us in slowest:
+        print(f"  {cumulative_us:>9}  {module}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# utils/synthetic_terrain.py
+"""
+Mundo sintético para probar la búsqueda del teletransporte sin un servidor de Minecraft.
+
+Genera de forma determinista (según la semilla) un terreno con colinas, océanos,
+cuevas, lagos de lava subterráneos y en superficie, y salientes de piedra sobre el suelo.
+Implementa la misma interfaz que `MinecraftBlockQuery`, así que la búsqueda no distingue
+si consulta el mundo real o este.
+"""
+import math
+from functools import lru_cache
+from typing import Tuple
+
+BOTTOM_Y = -64
+TOP_Y = 319
+SEA_LEVEL = 62
+# Por debajo de esta altura las cuevas se llenan de lava
+LAVA_LEVEL = -54
+
+def _smooth(t: float) -> float:
+    return t * t * (3 - 2 * t)
+
+def _lerp(a: float, b: float, t: float) -> float:
+    return a + (b - a) * t
+
+class SyntheticWorld:
+    """Terreno procedural a partir de ruido de valores (fractal) con una semilla."""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        # Cada instancia tiene sus propias cachés para que dos semillas no se mezclen
+        self._lattice = lru_cache(maxsize=1 << 18)(self._lattice_value)
+        self.surface = lru_cache(maxsize=1 << 16)(self._surface)
+
+    def _lattice_value(self, *coords: int) -> float:
+        """Valor pseudoaleatorio en [-1, 1] para un punto entero de la rejilla."""
+        h = (self.seed * 0x9E3779B1 + 0x7F4A7C15) & 0xFFFFFFFF
+        for c in coords:
+            h ^= (c * 0x85EBCA6B) & 0xFFFFFFFF
+            h = (h * 0xC2B2AE35 + 0x165667B1) & 0xFFFFFFFF
+            h ^= h >> 15
+        return h / 0x7FFFFFFF - 1.0
+
+    def _noise2(self, x: float, z: float, salt: int) -> float:
+        x0, z0 = math.floor(x), math.floor(z)
+        tx, tz = _smooth(x - x0), _smooth(z - z0)
+        v = self._lattice
+        return _lerp(
+            _lerp(v(salt, x0, z0), v(salt, x0 + 1, z0), tx),
+            _lerp(v(salt, x0, z0 + 1), v(salt, x0 + 1, z0 + 1), tx),
+            tz,
+        )
+
+    def _noise3(self, x: float, y: float, z: float, salt: int) -> float:
+        x0, y0, z0 = math.floor(x), math.floor(y), math.floor(z)
+        tx, ty, tz = _smooth(x - x0), _smooth(y - y0), _smooth(z - z0)
+        v = self._lattice
+
+        def plane(yi: int) -> float:
+            return _lerp(
+                _lerp(v(salt, x0, yi, z0), v(salt, x0 + 1, yi, z0), tx),
+                _lerp(v(salt, x0, yi, z0 + 1), v(salt, x0 + 1, yi, z0 + 1), tx),
+                tz,
+            )
+
+        return _lerp(plane(y0), plane(y0 + 1), ty)
+
+    def _fbm2(self, x: float, z: float, salt: int, octaves: int = 3) -> float:
+        total, amplitude, norm = 0.0, 1.0, 0.0
+        for octave in range(octaves):
+            total += amplitude * self._noise2(x, z, salt + octave)
+            norm += amplitude
+            x, z, amplitude = x * 2, z * 2, amplitude / 2
+        return total / norm
+
+    def _surface(self, x: int, z: int) -> int:
+        """Altura del suelo de la columna: continentes y océanos a gran escala más colinas."""
+        continent = self._fbm2(x / 400, z / 400, salt=1)
+        hills = self._fbm2(x / 48, z / 48, salt=10)
+        return int(SEA_LEVEL + 2 + continent * 40 + hills * 14)
+
+    def _is_cave(self, x: int, y: int, z: int) -> bool:
+        return self._noise3(x / 24, y / 12, z / 24, salt=20) > 0.6
+
+    def _is_overhang(self, x: int, y: int, z: int) -> bool:
+        return self._noise3(x / 20, y / 8, z / 20, salt=30) > 0.55
+
+    def _has_surface_lava(self, x: int, z: int) -> bool:
+        return self._noise2(x / 16, z / 16, salt=40) > 0.8
+
+    def block_at(self, x: int, y: int, z: int) -> str:
+        if y < BOTTOM_Y or y > TOP_Y:
+            return "air"
+        if y == BOTTOM_Y:
+            return "bedrock"
+
+        surface = self.surface(x, z)
+        if y <= surface:
+            if y < surface - 3 and self._is_cave(x, y, z):
+                return "lava" if y <= LAVA_LEVEL else "air"
+            if y == surface:
+                if surface > SEA_LEVEL and self._has_surface_lava(x, z):
+                    return "lava"
+                if surface < SEA_LEVEL - 12:
+                    return "gravel"
+                return "sand" if surface <= SEA_LEVEL + 1 else "grass_block"
+            if y > surface - 4:
+                return "sand" if surface <= SEA_LEVEL + 1 else "dirt"
+            return "stone"
+
+        # Sobre el suelo: salientes de piedra flotando sobre tierra firme
+        if surface > SEA_LEVEL and surface + 4 < y < surface + 24 and self._is_overhang(x, y, z):
+            return "stone"
+        if y <= SEA_LEVEL:
+            return "water"
+        return "air"
+
+    async def is_block(self, x: int, y: int, z: int, block: str) -> bool:
+        return self.block_at(x, y, z) == block
+
+    def landing(self, x: int, y: int, z: int) -> str:
+        """Clasifica dónde quedaría el jugador: "solid", "water", "lava", "falling" o "stuck"."""
+        if self.block_at(x, y, z) != "air" or self.block_at(x, y + 1, z) != "air":
+            return "stuck"
+        below = self.block_at(x, y - 1, z)
+        if below == "air":
+            return "falling"
+        if below in ("water", "lava"):
+            return below
+        return "solid"
+
+    def highest_safe_y(self, x: int, z: int, min_y: int = BOTTOM_Y + 1, max_y: int = TOP_Y - 1) -> Tuple[int | None, str]:
+        """Verdad de referencia: la altura más alta con suelo sólido y dos bloques libres, y su tipo de suelo."""
+        for y in range(max_y, min_y - 1, -1):
+            kind = self.landing(x, y, z)
+            if kind == "solid":
+                return y, kind
+        return None, "none"
@@ -0,0 +1,90 @@
+# utils/teleport_bench.py
+"""
+Mide la búsqueda de altura segura del teletransporte contra un mundo sintético.
+
+Uso:
+    python -m utils.teleport_bench --columns 2000 --seed 1
+
+Para cada columna aleatoria se ejecuta `find_safe_y` igual que en `/teleport_player` y se
+compara con la verdad de referencia del mundo. Cada consulta equivale a un `testforblock`,
+es decir, a un viaje de ida y vuelta al servidor.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+from utils.synthetic_terrain import SyntheticWorld
+from utils.teleport_search import find_safe_y
+
+def _percentile(values: List[int], fraction: float) -> int:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+async def benchmark(columns: int, seed: int, spread: int) -> Dict[str, Any]:
+    world = SyntheticWorld(seed)
+    rng = random.Random(seed)
+    probes: List[int] = []
+    iterations: List[int] = []
+    landings: Counter = Counter()
+    found = 0
+    reachable = 0
+    optimal = 0
+
+    start = time.perf_counter()
+    for _ in range(columns):
+        x, z = rng.randint(-spread, spread), rng.randint(-spread, spread)
+        result = await find_safe_y(world, x, z, rng=rng)
+        probes.append(result.probes)
+        iterations.append(result.iterations)
+
+        best_y, _ = world.highest_safe_y(result.x, result.z)
+        if best_y is not None:
+            reachable += 1
+        if result.y is None:
+            landings["not_found"] += 1
+            continue
+        found += 1
+        # La altura se valida en la columna final, que puede haber cambiado por los desplazamientos
+        landings[world.landing(result.x, result.y, result.z)] += 1
+        if result.y == best_y:
+            optimal += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "columns": columns,
+        "found": found,
+        "success_rate": landings["solid"] / columns,
+        "reachable_rate": reachable / columns,
+        "optimal_rate": optimal / columns,
+        "landings": dict(landings),
+        "probes_mean": statistics.mean(probes),
+        "probes_p50": statistics.median(probes),
+        "probes_p95": _percentile(probes, 0.95),
+        "probes_max": max(probes),
+        "iterations_mean": statistics.mean(iterations),
+        "hit_iteration_cap": sum(1 for count in iterations if count >= 100),
+        "elapsed": elapsed,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide consultas por teletransporte y tasa de éxito en un mundo sintético.")
+    parser.add_argument("--columns", type=int, default=2000, help="Número de columnas a probar")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del mundo y de las columnas")
+    parser.add_argument("--spread", type=int, default=3000, help="Distancia máxima al origen de las columnas")
+    args = parser.parse_args()
+
+    summary = asyncio.run(benchmark(args.columns, args.seed, args.spread))
+    print(f"Columnas: {summary['columns']}  (con suelo seguro: {summary['reachable_rate']:.1%})")
+    print(f"Éxito (suelo sólido): {summary['success_rate']:.1%}  ·  altura óptima: {summary['optimal_rate']:.1%}")
+    print(f"Aterrizajes: {summary['landings']}")
+    print(f"Consultas por teletransporte: media {summary['probes_mean']:.1f}, p50 {summary['probes_p50']}, "
+          f"p95 {summary['probes_p95']}, máx {summary['probes_max']}")
+    print(f"Iteraciones: media {summary['iterations_mean']:.1f}, tope de 100 alcanzado {summary['hit_iteration_cap']} veces")
+    print(f"Tiempo: {summary['elapsed']:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# utils/teleport_search.py
+import random
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from core.queries import test_for_block
+
+DANGEROUS_BLOCKS = ["lava", "flowing_lava", "fire", "air"]
+GRAVITY_BLOCKS = ["sand", "gravel"]
+
+# Límites de la búsqueda (rango de altura en Minecraft Bedrock)
+MIN_Y = -59
+MAX_Y = 320
+LEVEL_ABOVE_SEA = 64
+MAX_ITERATIONS = 100
+# Distancia máxima, en cada eje, de un teletransporte aleatorio
+RANDOM_TELEPORT_RANGE = 3000
+# Radio en el que `spreadplayers` busca un bloque seguro alrededor del destino
+SPREAD_RADIUS = 16
+
+class BlockQuery(Protocol):
+    """Fuente de bloques para la búsqueda: el mundo real o uno simulado."""
+
+    async def is_block(self, x: int, y: int, z: int, block: str) -> bool:
+        """Equivale a `testforblock x y z block`: True si el bloque coincide."""
+        ...
+
+class MinecraftBlockQuery:
+    """Consulta los bloques al servidor de Minecraft con `testforblock`."""
+
+    async def is_block(self, x: int, y: int, z: int, block: str) -> bool:
+        return await test_for_block(x, y, z, block)
+
+minecraft_blocks = MinecraftBlockQuery()
+
+def spread_command(player: str, x: float, z: float) -> str:
+    """
+    Teletransporte en un solo comando: `spreadplayers` deja al jugador sobre el bloque seguro más alto
+    cerca de (x, z), sin la búsqueda con `testforblock`. No se sabe de antemano la altura final.
+    """
+    return f'spreadplayers {int(x)} {int(z)} 0 {SPREAD_RADIUS} "{player}"'
+
+class CountingBlockQuery:
+    """Envuelve otra fuente y cuenta cuántas consultas (viajes al servidor) se hicieron."""
+
+    def __init__(self, inner: BlockQuery):
+        self.inner = inner
+        self.probes = 0
+
+    async def is_block(self, x: int, y: int, z: int, block: str) -> bool:
+        self.probes += 1
+        return await self.inner.is_block(x, y, z, block)
+
+# Función para verificar si una ubicación es segura
+async def is_safe_location(blocks: BlockQuery, x: int, y: int, z: int) -> tuple[bool, str]:
+    # 1. Comprueba si los bloques de los pies y la cabeza están libres
+    feet_is_air = await blocks.is_block(x, y, z, "air")
+    head_is_air = await blocks.is_block(x, y + 1, z, "air")
+
+    if not feet_is_air or not head_is_air:
+        return False, "no_space"
+
+    # 2. Comprueba si el bloque de abajo es sólido y no peligroso
+    if await blocks.is_block(x, y - 1, z, "air"):
+        return False, "no_floor"
+
+    for block in DANGEROUS_BLOCKS:
+        if await blocks.is_block(x, y - 1, z, block):
+            return False, "dangerous_block"
+
+    return True, "safe"
+
+@dataclass
+class SearchResult:
+    """Resultado de la búsqueda: altura segura (None si no se encontró) y columna final tras los desplazamientos."""
+    x: int
+    z: int
+    y: int | None
+    iterations: int
+    probes: int
+
+# Recibe (iteración, altura probada, límite inferior, límite superior, motivo)
+ProbeCallback = Callable[[int, int, int, int, str], None]
+
+async def find_safe_y(
+    blocks: BlockQuery,
+    x: float,
+    z: float,
+    rng: random.Random | None = None,
+    on_probe: ProbeCallback | None = None,
+) -> SearchResult:
+    """
+    Busca la altura segura más alta de la columna (x, z) con una búsqueda binaria guiada por el motivo de cada fallo.
+    Si el bloque está ocupado o es peligroso, desplaza ligeramente X y Z y vuelve a probar.
+    """
+    rng = rng or random
+    counter = CountingBlockQuery(blocks)
+    destination_x, destination_z = int(x), int(z)
+
+    safe_destination_y = None
+    low = MIN_Y
+    high = MAX_Y
+    last_high = MAX_Y
+    i = 1
+    while low <= high:
+        mid = (low + high) // 2
+        is_safe, reason = await is_safe_location(counter, destination_x, mid, destination_z)
+        if on_probe is not None:
+            on_probe(i, mid, low, high, reason)
+        i = i + 1
+        if is_safe:
+            # Si es seguro, guarda esta posición y busca una más alta
+            safe_destination_y = mid
+            low = mid + 1
+        elif low == high or i > MAX_ITERATIONS: # Si no se encuentra una posición segura en 100 intentos, se detiene la búsqueda
+            break
+        elif reason == "no_floor":
+            # Si no hay piso (es aire), busca más abajo y guarda la última altura alta conocida (ya que desde el punto más alto original hasta esta, sabemos que es aire)
+            last_high = high
+            high = (mid + high) // 2
+        elif reason == "no_space":
+            # Si no hay espacio (bloque sólido en los pies o cabeza), busca más arriba solo si el promedio esta sobre el nivel del mar
+            if mid < LEVEL_ABOVE_SEA:
+                low = mid + 1
+            else:
+                high = last_high
+        else: # "dangerous_block"
+            # Si está bloqueado o es peligroso, repite la validacion en la misma altura pero cambiando X y Z ligeramente
+            destination_x = destination_x + rng.randint(-5, 5)
+            destination_z = destination_z + rng.randint(-5, 5)
+
+    return SearchResult(x=destination_x, z=destination_z, y=safe_destination_y, iterations=i - 1, probes=counter.probes)
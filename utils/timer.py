@@ -1,13 +1,11 @@
 # utils/timer.py
 import asyncio
-import random
 from typing import Dict, Any
 
 from fastapi import HTTPException
 from core.commands import send_minecraft_command
-from config.const import random_events
-from api.routes import roulette_effect, spawn_mob_at_player, teleport_player
-from core.commands import send_minecraft_command
+from core.random_events import PreparedEvent, random_event_pipeline
+from config.const import random_event_prewarm_seconds
 
 async def send_countdown_timer(duration: int, player_data: Dict[str, Any], player_name: str):
     """
@@ -24,11 +22,16 @@ async def send_countdown_timer(duration: int, player_data: Dict[str, Any], playe
         raise HTTPException(status_code=404, detail=f"No se encontró al jugador {player_name}.")
 
     timer_data = player_data[player_name]['timer']
+    # Evento de la vuelta actual, preparado unos segundos antes de que acabe la cuenta atrás
+    prepared: PreparedEvent | None = None
     
     try:
         while True:
             remaining_time = timer_data.get("remaining_time", 0)
             while timer_data.get('is_running', False) and remaining_time >= 0:
+                if prepared is None and remaining_time <= random_event_prewarm_seconds and player_data:
+                    prepared = random_event_pipeline.prepare(player_name)
+
                 minutes = remaining_time // 60
                 seconds = remaining_time % 60
                 
@@ -43,8 +46,9 @@ async def send_countdown_timer(duration: int, player_data: Dict[str, Any], playe
                 remaining_time -= 1
             
             if timer_data["is_running"]:
-                # Ejecuta un evento aleatorio
-                await run_random_event(player_data, player_name)
+                # Ejecuta el evento aleatorio preparado
+                await run_random_event(player_data, player_name, prepared)
+                prepared = None
             
             if timer_data["mode"] == "loop" and timer_data["is_running"]:
                 # Reinicia el temporizador si el modo es "loop" y no ha sido detenido
@@ -63,6 +67,8 @@ async def send_countdown_timer(duration: int, player_data: Dict[str, Any], playe
         # Manejamos errores si la conexión se pierde
         print(f"HTTPException en el temporizador: {e.detail}")
     finally:
+        if prepared is not None:
+            prepared.cancel()
         if player_name in player_data and 'timer' in player_data[player_name]:
             timer_data['is_running'] = False
             timer_data['task'] = None
@@ -70,60 +76,22 @@ async def send_countdown_timer(duration: int, player_data: Dict[str, Any], playe
     # Limpia la barra de acción una última vez si el bucle terminó
     await send_minecraft_command(f'title {player_name} actionbar ""',  wait=False)
 
-async def run_random_event(player_data: Dict[str, Any], player_name: str):
+async def run_random_event(player_data: Dict[str, Any], player_name: str, prepared: PreparedEvent | None = None):
     """
-    Selecciona un evento aleatorio de la lista y lo ejecuta.
+    Ejecuta el evento aleatorio preparado durante la cuenta atrás (o uno nuevo si no se preparó).
     """
     if not player_data:
+        if prepared is not None:
+            prepared.cancel()
         await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§cNo hay jugadores conectados. No se puede ejecutar el evento."}}]}}', wait=False)
         return
 
-    # Elige un evento al azar de la lista
-    event_to_run = random.choice(random_events)
-    
-    # Prepara los argumentos y el nombre de la función a llamar
-    command_name = event_to_run["command"]
-    args: Dict = event_to_run["args"]
-    
-    # Actualiza el nombre del jugador si es necesario
-    if args.get("player_name") == "random":
-        args["player_name"] = random.choice(list(player_data.keys()))
-    else:
-        args["player_name"] = player_name
+    if prepared is None:
+        prepared = random_event_pipeline.prepare(player_name, warm=False)
 
-    await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§e¡El cronómetro ha terminado! \n §cSOBREVIVE A {event_to_run["name"]}."}}]}}', wait=False)
+    await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§e¡El cronómetro ha terminado! \n §cSOBREVIVE A {prepared.event.name}."}}]}}', wait=False)
 
-    # Ejecuta la función del evento
     try:
-        # Usa un diccionario para llamar a la función correcta
-        event_handlers = {
-            "spawn_mob_at_player": spawn_mob_at_player,
-            "teleport_player": teleport_player,
-            "roulette_effect": roulette_effect,
-        }
-        
-        handler = event_handlers.get(command_name)
-        if handler:
-            # Los argumentos deben ser un objeto Request
-            from models import MobRequest, TeleportRequest # Importa tus modelos de datos
-            
-            # Convierte los argumentos a los modelos de FastAPI si es necesario
-            if command_name == "spawn_mob_at_player":
-                mob_dict: Dict = args.get("mob_dict", {})
-                mob_type = random.choice(list(mob_dict.keys())) if mob_dict else "zombie"
-                
-                request_obj = MobRequest(mob_type=mob_type, quantity=random.randint(1,5), r=1)
-            elif command_name == "teleport_player":
-                request_obj = TeleportRequest(**args)
-            else:
-                request_obj = None # roulette_effect no necesita un Request body
-            
-            # Llama a la función del manejador con los argumentos correctos
-            if request_obj is None:
-                await handler(player_name=args["player_name"], username=args.get("username", "Cronometro"))
-            else:
-                await handler(request_obj, player_name=args["player_name"], username=args.get("username", "Cronometro"))
-        else:
-            await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§cError: No se encontró el manejador para {command_name}."}}]}}', wait=False)
+        await random_event_pipeline.fire(prepared)
     except Exception as e:
-        await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§cError al ejecutar el evento: {e}"}}]}}', wait=False)
\ No newline at end of file
+        await send_minecraft_command(f'tellraw "{player_name}" {{"rawtext":[{{"text":"§cError al ejecutar el evento: {e}"}}]}}', wait=False)
@@ -0,0 +1,37 @@
+# utils/token_bucket.py
+import math
+import time
+
+class TokenBucket:
+    """Cubeta de fichas: `rate` fichas por segundo hasta un máximo de `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float = 1.0) -> bool:
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def wait_time(self, amount: float = 1.0) -> float:
+        """Segundos hasta que haya `amount` fichas disponibles (infinito si la cubeta no se rellena)."""
+        self._refill()
+        if self.tokens >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (amount - self.tokens) / self.rate